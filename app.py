@@ -1,10 +1,31 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import io
 import json
-import plotly.express as px
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 st.set_page_config(layout="wide")
 
+# Prefer orjson for parsing uploaded match files, falling back to the standard library
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Prefer pyarrow's C++ CSV writer for downloads, falling back to pandas
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    # Body rows only, unquoted; values that would need quoting make Arrow raise and go through pandas
+    ARROW_CSV_OPTIONS = pa_csv.WriteOptions(include_header=False, quoting_style='none')
+except ImportError:
+    pa = None
+
 # Import betting markets functions with comprehensive error handling
 BETTING_MARKETS_AVAILABLE = False
 betting_markets_error = None
@@ -28,6 +49,71 @@ if not BETTING_MARKETS_AVAILABLE:
 
 # --- Helper Functions ---
 
+PHASES = ('powerplay', 'middle', 'death')
+
+def over_phase_ids(over_numbers):
+    """Map 0-indexed over numbers to PHASES indexes: overs 0-5 powerplay, 6-14 middle, 15+ death."""
+    return (over_numbers >= 6).astype(np.int8) + (over_numbers >= 15)
+
+def count_ball_outcomes(group_ids, n_groups, phase_ids, runs_bat, is_dot, is_wicket):
+    """
+    Count ball outcomes per group (e.g. batting team) and phase from per-ball column arrays.
+    
+    The runs histogram for every group and phase comes from a single np.bincount
+    over a combined (group, phase, runs) code, so each column is only read once.
+    
+    Returns:
+        tuple: (runs_hist, dots, wickets) where runs_hist[group, phase, runs] is a ball
+               count and dots/wickets[group, phase] are per-phase counts
+    """
+    n_phases = len(PHASES)
+    n_runs = max(int(runs_bat.max(initial=0)) + 1, 7)
+    group_phase = group_ids.astype(np.intp) * n_phases + phase_ids
+    runs_hist = np.bincount(group_phase * n_runs + runs_bat, minlength=n_groups * n_phases * n_runs)
+    dots = np.bincount(group_phase, weights=is_dot, minlength=n_groups * n_phases)
+    wickets = np.bincount(group_phase, weights=is_wicket, minlength=n_groups * n_phases)
+    return (runs_hist.reshape(n_groups, n_phases, n_runs),
+            dots.reshape(n_groups, n_phases),
+            wickets.reshape(n_groups, n_phases))
+
+def calculate_phase_stats(runs_hist, dots, wickets):
+    """
+    Calculate per-phase ball outcome statistics from count_ball_outcomes() counts.
+    
+    Returns:
+        dict: Phase name to its statistics, or None for phases without deliveries
+    """
+    balls = runs_hist.sum(axis=1)
+    runs = runs_hist @ np.arange(runs_hist.shape[1])
+    
+    phase_stats = {}
+    for phase_id, phase in enumerate(PHASES):
+        phase_balls = int(balls[phase_id])
+        if phase_balls:
+            phase_stats[phase] = {
+                'balls': phase_balls,
+                'avg_runs_per_ball': runs[phase_id] / phase_balls,
+                'run_rate': (runs[phase_id] / phase_balls) * 6,
+                'dot_ball_percentage': (dots[phase_id] / phase_balls) * 100,
+                'single_percentage': (runs_hist[phase_id, 1] / phase_balls) * 100,
+                'four_percentage': (runs_hist[phase_id, 4] / phase_balls) * 100,
+                'six_percentage': (runs_hist[phase_id, 6] / phase_balls) * 100,
+                'wicket_percentage': (wickets[phase_id] / phase_balls) * 100
+            }
+        else:
+            phase_stats[phase] = None
+    return phase_stats
+
+def runs_probabilities(runs_counts, total_balls):
+    """Convert a legal-ball histogram of runs off the bat into runs_0..runs_6 probability fields."""
+    probabilities = np.asarray(runs_counts[:7], dtype=np.float64) / total_balls * 100
+    return {f'runs_{runs}_probability': p for runs, p in enumerate(probabilities.tolist())}
+
+def format_overs(balls):
+    """Format a Series of ball counts as cricket overs notation, e.g. 23 -> '3.5'."""
+    overs, rem = np.divmod(balls.to_numpy(dtype=np.int64), 6)
+    return pd.Series([f'{o}.{r}' for o, r in zip(overs.tolist(), rem.tolist())], index=balls.index, dtype=str)
+
 def categorize_pitch(venue_stats):
     """Categorize the pitch profile based on venue statistics."""
     run_rate = venue_stats.get('avg_run_rate', 0)
@@ -45,179 +131,262 @@ def categorize_pitch(venue_stats):
     else:
         return "Balanced"
 
-def calculate_team_stats(all_deliveries, team_name):
+def calculate_team_stats(team_name, runs_hist, phase_dots, phase_wickets):
     """
     Calculate statistics for a specific team.
     
     Args:
-        all_deliveries: List of delivery data
         team_name: Name of the team to analyze
+        runs_hist, phase_dots, phase_wickets: The team's slice of count_ball_outcomes() counts
     
     Returns:
         dict: Team-specific statistics
     """
-    team_deliveries = [d for d in all_deliveries if d['team'] == team_name]
-    
-    if not team_deliveries:
+    total_balls = int(runs_hist.sum())
+    if not total_balls:
         return None
     
-    total_balls = len(team_deliveries)
+    runs_counts = runs_hist.sum(axis=0)
+    avg_runs_per_ball = (runs_counts @ np.arange(runs_counts.size)) / total_balls
+    wicket_count = int(phase_wickets.sum())
+    boundary_count = int(runs_counts[4] + runs_counts[6])
     
     # Calculate basic statistics for the team
     team_stats = {
         'team_name': team_name,
         'total_balls': total_balls,
-        'avg_runs_per_ball': sum(d['runs_off_bat'] for d in team_deliveries) / total_balls,
-        'avg_run_rate': (sum(d['runs_off_bat'] for d in team_deliveries) / total_balls) * 6,
-        'dot_ball_percentage': (sum(1 for d in team_deliveries if d['is_dot']) / total_balls) * 100,
-        'single_percentage': (sum(1 for d in team_deliveries if d['is_single']) / total_balls) * 100,
-        'four_percentage': (sum(1 for d in team_deliveries if d['is_four']) / total_balls) * 100,
-        'six_percentage': (sum(1 for d in team_deliveries if d['is_six']) / total_balls) * 100,
-        'wicket_percentage': (sum(1 for d in team_deliveries if d['is_wicket']) / total_balls) * 100,
-        'boundary_percentage': (sum(1 for d in team_deliveries if d['is_four'] or d['is_six']) / total_balls) * 100
+        'avg_runs_per_ball': avg_runs_per_ball,
+        'avg_run_rate': avg_runs_per_ball * 6,
+        'dot_ball_percentage': (phase_dots.sum() / total_balls) * 100,
+        'single_percentage': (runs_counts[1] / total_balls) * 100,
+        'four_percentage': (runs_counts[4] / total_balls) * 100,
+        'six_percentage': (runs_counts[6] / total_balls) * 100,
+        'wicket_percentage': (wicket_count / total_balls) * 100,
+        'boundary_percentage': (boundary_count / total_balls) * 100
     }
     
     # Runs distribution for the team
-    for runs in range(7):
-        count = sum(1 for d in team_deliveries if d['runs_off_bat'] == runs)
-        team_stats[f'runs_{runs}_probability'] = (count / total_balls) * 100
+    team_stats.update(runs_probabilities(runs_counts, total_balls))
     
     # Phase-wise statistics for the team
-    for phase in ['powerplay', 'middle', 'death']:
-        phase_deliveries = [d for d in team_deliveries if d['phase'] == phase]
-        if phase_deliveries:
-            phase_balls = len(phase_deliveries)
-            team_stats[f'{phase}_stats'] = {
-                'balls': phase_balls,
-                'avg_runs_per_ball': sum(d['runs_off_bat'] for d in phase_deliveries) / phase_balls,
-                'run_rate': (sum(d['runs_off_bat'] for d in phase_deliveries) / phase_balls) * 6,
-                'dot_ball_percentage': (sum(1 for d in phase_deliveries if d['is_dot']) / phase_balls) * 100,
-                'single_percentage': (sum(1 for d in phase_deliveries if d['is_single']) / phase_balls) * 100,
-                'four_percentage': (sum(1 for d in phase_deliveries if d['is_four']) / phase_balls) * 100,
-                'six_percentage': (sum(1 for d in phase_deliveries if d['is_six']) / phase_balls) * 100,
-                'wicket_percentage': (sum(1 for d in phase_deliveries if d['is_wicket']) / phase_balls) * 100
-            }
-        else:
-            team_stats[f'{phase}_stats'] = None
+    for phase, phase_stats in calculate_phase_stats(runs_hist, phase_dots, phase_wickets).items():
+        team_stats[f'{phase}_stats'] = phase_stats
     
     # Additional team-specific metrics
-    wicket_balls = [d for d in team_deliveries if d['is_wicket']]
-    if wicket_balls:
-        team_stats['avg_balls_between_wickets'] = total_balls / len(wicket_balls)
+    if wicket_count:
+        team_stats['avg_balls_between_wickets'] = total_balls / wicket_count
     
-    boundary_balls = [d for d in team_deliveries if d['is_four'] or d['is_six']]
-    if boundary_balls:
-        team_stats['avg_balls_between_boundaries'] = total_balls / len(boundary_balls)
+    if boundary_count:
+        team_stats['avg_balls_between_boundaries'] = total_balls / boundary_count
     
     return team_stats
 
-def calculate_venue_wise_stats(data_list):
+def flatten_deliveries(data_list):
+    """
+    Flatten every delivery of every match into per-ball column arrays.
+    
+    Balls point to their over, overs to their innings and innings to their match,
+    so per-innings or per-over totals are a single np.bincount away.
+    
+    Args:
+        data_list: List of cricket match data (JSON format)
+    
+    Returns:
+        dict: Per-ball columns ('over_id', 'runs_off_bat', 'total_runs', 'is_wicket', 'is_legal'),
+              per-over columns ('over_innings', 'over_number'), per-innings columns
+              ('innings_match', 'innings_number', 'innings_team') and the 'teams' name table
+    """
+    # Flat (over_id, runs_off_bat, total_runs, is_wicket, is_legal) records, five values per ball
+    balls = []
+    over_innings, over_number = [], []
+    innings_match, innings_number, innings_team = [], [], []
+    team_index = {}
+    
+    for match_id, data in enumerate(data_list):
+        for inning_idx, inning in enumerate(data.get('innings', [])):
+            innings_id = len(innings_match)
+            innings_match.append(match_id)
+            innings_number.append(inning_idx)
+            innings_team.append(team_index.setdefault(inning.get('team', 'Unknown'), len(team_index)))
+            for over in inning.get('overs', []):
+                over_id = len(over_number)
+                over_innings.append(innings_id)
+                over_number.append(over.get('over', 0))
+                for delivery in over.get('deliveries', []):
+                    ball_runs = delivery['runs']
+                    extras = delivery.get('extras')
+                    balls.extend((over_id, ball_runs['batter'], ball_runs['total'], 'wickets' in delivery,
+                                  extras is None or ('wides' not in extras and 'noballs' not in extras)))
+    
+    over_ids, runs_bat, runs_tot, is_wicket, is_legal = np.fromiter(balls, dtype=np.int32, count=len(balls)).reshape(-1, 5).T.copy()
+    return {
+        'over_id': over_ids,
+        'runs_off_bat': runs_bat,
+        'total_runs': runs_tot,
+        'is_wicket': is_wicket.astype(bool),
+        'is_legal': is_legal.astype(bool),
+        'over_innings': np.array(over_innings, dtype=np.int32),
+        'over_number': np.array(over_number, dtype=np.int32),
+        'innings_match': np.array(innings_match, dtype=np.int32),
+        'innings_number': np.array(innings_number, dtype=np.int32),
+        'innings_team': np.array(innings_team, dtype=np.int32),
+        'teams': tuple(team_index)
+    }
+
+# Columns of calculate_innings_totals()['totals']
+INNINGS_FIELDS = ('runs', 'balls', 'dots', 'fours', 'sixes', 'wickets', 'powerplay_runs', 'death_over_runs')
+RUNS, BALLS, DOTS, FOURS, SIXES, WICKETS, POWERPLAY_RUNS, DEATH_OVER_RUNS = range(len(INNINGS_FIELDS))
+
+def calculate_innings_totals(deliveries):
+    """
+    Sum flattened deliveries per innings.
+    
+    Args:
+        deliveries: Column arrays as built by flatten_deliveries
+    
+    Returns:
+        dict: 'totals', an innings x INNINGS_FIELDS array, and 'runs_counts', an innings x 7
+              array of legal balls by runs off the bat
+    """
+    n_innings = len(deliveries['innings_match'])
+    innings_ids = deliveries['over_innings'][deliveries['over_id']]
+    # Phase of each ball, looked up from a per-over table
+    ball_phases = over_phase_ids(deliveries['over_number'])[deliveries['over_id']]
+    runs_bat = deliveries['runs_off_bat']
+    runs_tot = deliveries['total_runs']
+    is_legal = deliveries['is_legal']
+    
+    weights = (runs_tot, is_legal, runs_bat == 0, runs_bat == 4, runs_bat == 6, deliveries['is_wicket'],
+               np.where(ball_phases == 0, runs_tot, 0), np.where(ball_phases == 2, runs_tot, 0))
+    totals = np.column_stack([np.bincount(innings_ids, weights=w, minlength=n_innings) for w in weights]).astype(np.int64)
+    
+    counted = is_legal & (runs_bat <= 6)
+    runs_counts = np.bincount(innings_ids[counted] * 7 + runs_bat[counted], minlength=n_innings * 7)
+    return {'totals': totals.reshape(n_innings, len(INNINGS_FIELDS)), 'runs_counts': runs_counts.reshape(n_innings, 7)}
+
+def summarize_innings_by_group(innings_totals, group_ids, n_groups):
+    """
+    Fold per-innings totals into groups such as venues or teams.
+    
+    Args:
+        innings_totals: Result of calculate_innings_totals
+        group_ids: Group of each innings; negative ids are left out
+        n_groups: Number of groups
+    
+    Returns:
+        dict: Per-group 'innings' counts, summed 'totals' and 'runs_counts' rows, and the
+              'highest' and 'lowest' innings runs (0 for a group without innings)
+    """
+    keep = group_ids >= 0
+    groups = group_ids[keep]
+    totals = innings_totals['totals'][keep]
+    runs_counts = innings_totals['runs_counts'][keep]
+    
+    summed_totals = np.zeros((n_groups, totals.shape[1]), dtype=np.int64)
+    np.add.at(summed_totals, groups, totals)
+    summed_runs_counts = np.zeros((n_groups, runs_counts.shape[1]), dtype=np.int64)
+    np.add.at(summed_runs_counts, groups, runs_counts)
+    
+    innings_count = np.bincount(groups, minlength=n_groups)
+    highest = np.full(n_groups, np.iinfo(np.int64).min)
+    np.maximum.at(highest, groups, totals[:, RUNS])
+    lowest = np.full(n_groups, np.iinfo(np.int64).max)
+    np.minimum.at(lowest, groups, totals[:, RUNS])
+    highest[innings_count == 0] = 0
+    lowest[innings_count == 0] = 0
+    
+    return {
+        'innings': innings_count.tolist(),
+        'totals': summed_totals.tolist(),
+        'runs_counts': summed_runs_counts,
+        'highest': highest.tolist(),
+        'lowest': lowest.tolist()
+    }
+
+def _new_venue_stats():
+    """Empty per-venue accumulators for calculate_venue_wise_stats."""
+    return {
+        'matches': 0
+    }
+
+def calculate_venue_wise_stats(data_list, deliveries=None):
     """
     Calculate venue-wise statistics for cricket matches.
     
     Args:
         data_list: List of cricket match data (JSON format)
+        deliveries: flatten_deliveries(data_list), if already computed
     
     Returns:
         dict: Venue-wise statistics including scoring patterns, outcomes, and conditions
     """
-    venue_stats = {}
+    venue_stats = defaultdict(_new_venue_stats)
+    if deliveries is None:
+        deliveries = flatten_deliveries(data_list)
+    innings_totals = calculate_innings_totals(deliveries)
+    # Venue, result and toss decision of each match
+    match_venues, match_decided, toss_winner_won, toss_decisions = [], [], [], []
     
     for data in data_list:
         venue = data.get('info', {}).get('venue', 'Unknown Venue')
         
-        if venue not in venue_stats:
-            venue_stats[venue] = {
-                'matches': 0,
-                'total_runs': 0,
-                'total_balls': 0,
-                'total_wickets': 0,
-                'total_fours': 0,
-                'total_sixes': 0,
-                'total_dots': 0,
-                'innings_scores': [],
-                'toss_winners': [],
-                'match_winners': [],
-                'toss_decisions': [],
-                'first_innings_scores': [],
-                'second_innings_scores': [],
-                'powerplay_runs': [],
-                'death_over_runs': [],
-                'team_totals': []
-            }
-        
-        venue_data = venue_stats[venue]
-        venue_data['matches'] += 1
+        venue_stats[venue]['matches'] += 1
+        match_venues.append(venue)
         
         # Extract match info
         info = data.get('info', {})
-        venue_data['toss_winners'].append(info.get('toss', {}).get('winner', 'Unknown'))
-        venue_data['match_winners'].append(info.get('outcome', {}).get('winner', 'No Result'))
-        venue_data['toss_decisions'].append(info.get('toss', {}).get('decision', 'Unknown'))
-        
-        # Process innings
-        for inning_idx, inning in enumerate(data.get('innings', [])):
-            inning_runs = 0
-            inning_balls = 0
-            inning_wickets = 0
-            inning_fours = 0
-            inning_sixes = 0
-            inning_dots = 0
-            powerplay_runs = 0
-            death_over_runs = 0
-            
-            for over in inning.get('overs', []):
-                over_num = over.get('over', 0)
-                
-                for delivery in over.get('deliveries', []):
-                    # Skip extras for ball count
-                    if 'extras' not in delivery or not any(k in delivery['extras'] for k in ['wides', 'noballs']):
-                        inning_balls += 1
-                        venue_data['total_balls'] += 1
-                    
-                    runs = delivery['runs']['batter']
-                    total_runs = delivery['runs']['total']
-                    
-                    inning_runs += total_runs
-                    venue_data['total_runs'] += total_runs
-                    
-                    if runs == 0:
-                        inning_dots += 1
-                        venue_data['total_dots'] += 1
-                    elif runs == 4:
-                        inning_fours += 1
-                        venue_data['total_fours'] += 1
-                    elif runs == 6:
-                        inning_sixes += 1
-                        venue_data['total_sixes'] += 1
-                    
-                    if 'wickets' in delivery:
-                        inning_wickets += 1
-                        venue_data['total_wickets'] += 1
-                    
-                    # Phase-wise runs
-                    if over_num < 6:  # Powerplay
-                        powerplay_runs += total_runs
-                    elif over_num >= 15:  # Death overs
-                        death_over_runs += total_runs
-            
-            venue_data['innings_scores'].append(inning_runs)
-            venue_data['team_totals'].append(inning_runs)
-            venue_data['powerplay_runs'].append(powerplay_runs)
-            venue_data['death_over_runs'].append(death_over_runs)
-            
-            if inning_idx == 0:
-                venue_data['first_innings_scores'].append(inning_runs)
-            elif inning_idx == 1:
-                venue_data['second_innings_scores'].append(inning_runs)
+        toss = info.get('toss', {})
+        winner = info.get('outcome', {}).get('winner', 'No Result')
+        match_decided.append(winner != 'No Result')
+        toss_winner_won.append(winner == toss.get('winner', 'Unknown'))
+        toss_decisions.append(toss.get('decision', 'Unknown'))
+    
+    venue_ids = {venue: venue_id for venue_id, venue in enumerate(venue_stats)}
+    match_venue_ids = np.array([venue_ids[venue] for venue in match_venues], dtype=np.intp)
+    
+    # Per-venue match counts for the toss and decision rates, over decided matches only
+    decided = np.array(match_decided, dtype=bool)
+    toss_won = decided & np.array(toss_winner_won, dtype=bool)
+    toss_decisions = np.array(toss_decisions)
+    match_counts = {
+        name: np.bincount(match_venue_ids[mask], minlength=len(venue_stats)).tolist()
+        for name, mask in (
+            ('decided', decided),
+            ('toss_win_match_win', toss_won),
+            ('bat_first', decided & (toss_decisions == 'bat')),
+            ('bat_first_wins', toss_won & (toss_decisions == 'bat')),
+            ('bowl_first', decided & (toss_decisions == 'field')),
+            ('bowl_first_wins', toss_won & (toss_decisions == 'field'))
+        )
+    }
+    
+    # Per-venue innings totals, plus first and second innings on their own
+    innings_venues = match_venue_ids[deliveries['innings_match']]
+    innings_number = deliveries['innings_number']
+    all_innings = summarize_innings_by_group(innings_totals, innings_venues, len(venue_stats))
+    first_innings = summarize_innings_by_group(innings_totals, np.where(innings_number == 0, innings_venues, -1), len(venue_stats))
+    second_innings = summarize_innings_by_group(innings_totals, np.where(innings_number == 1, innings_venues, -1), len(venue_stats))
     
     # Calculate summary statistics for each venue
     venue_summary = {}
     for venue, stats in venue_stats.items():
         if stats['matches'] > 0:
+            venue_id = venue_ids[venue]
+            totals = all_innings['totals'][venue_id]
+            innings_count = all_innings['innings'][venue_id]
+            first_count = first_innings['innings'][venue_id]
+            second_count = second_innings['innings'][venue_id]
+            stats.update({
+                'total_runs': totals[RUNS],
+                'total_balls': totals[BALLS],
+                'total_wickets': totals[WICKETS],
+                'total_fours': totals[FOURS],
+                'total_sixes': totals[SIXES],
+                'total_dots': totals[DOTS]
+            })
             summary = {
                 'matches': stats['matches'],
-                'avg_total_runs_per_match': sum(stats['team_totals']) / len(stats['team_totals']) if stats['team_totals'] else 0,
+                'avg_total_runs_per_match': totals[RUNS] / innings_count if innings_count else 0,
                 'avg_runs_per_ball': stats['total_runs'] / stats['total_balls'] if stats['total_balls'] > 0 else 0,
                 'avg_run_rate': (stats['total_runs'] / stats['total_balls'] * 6) if stats['total_balls'] > 0 else 0,
                 'dot_ball_percentage': (stats['total_dots'] / stats['total_balls'] * 100) if stats['total_balls'] > 0 else 0,
@@ -225,12 +394,12 @@ def calculate_venue_wise_stats(data_list):
                 'six_percentage': (stats['total_sixes'] / stats['total_balls'] * 100) if stats['total_balls'] > 0 else 0,
                 'boundary_percentage': ((stats['total_fours'] + stats['total_sixes']) / stats['total_balls'] * 100) if stats['total_balls'] > 0 else 0,
                 'wicket_percentage': (stats['total_wickets'] / stats['total_balls'] * 100) if stats['total_balls'] > 0 else 0,
-                'avg_first_innings': sum(stats['first_innings_scores']) / len(stats['first_innings_scores']) if stats['first_innings_scores'] else 0,
-                'avg_second_innings': sum(stats['second_innings_scores']) / len(stats['second_innings_scores']) if stats['second_innings_scores'] else 0,
-                'avg_powerplay_runs': sum(stats['powerplay_runs']) / len(stats['powerplay_runs']) if stats['powerplay_runs'] else 0,
-                'avg_death_over_runs': sum(stats['death_over_runs']) / len(stats['death_over_runs']) if stats['death_over_runs'] else 0,
-                'highest_team_total': max(stats['team_totals']) if stats['team_totals'] else 0,
-                'lowest_team_total': min(stats['team_totals']) if stats['team_totals'] else 0,
+                'avg_first_innings': first_innings['totals'][venue_id][RUNS] / first_count if first_count else 0,
+                'avg_second_innings': second_innings['totals'][venue_id][RUNS] / second_count if second_count else 0,
+                'avg_powerplay_runs': totals[POWERPLAY_RUNS] / innings_count if innings_count else 0,
+                'avg_death_over_runs': totals[DEATH_OVER_RUNS] / innings_count if innings_count else 0,
+                'highest_team_total': all_innings['highest'][venue_id],
+                'lowest_team_total': all_innings['lowest'][venue_id],
                 'toss_win_match_win_rate': 0,
                 'bat_first_win_rate': 0,
                 'bowl_first_win_rate': 0
@@ -239,63 +408,70 @@ def calculate_venue_wise_stats(data_list):
             venue_summary[venue] = summary
             
             # Calculate toss and decision impact
-            toss_win_match_win = sum(1 for i, winner in enumerate(stats['match_winners']) 
-                                   if winner == stats['toss_winners'][i] and winner != 'No Result')
-            total_decided_matches = sum(1 for winner in stats['match_winners'] if winner != 'No Result')
-            
+            total_decided_matches = match_counts['decided'][venue_id]
             if total_decided_matches > 0:
-                venue_summary[venue]['toss_win_match_win_rate'] = (toss_win_match_win / total_decided_matches) * 100
+                venue_summary[venue]['toss_win_match_win_rate'] = (match_counts['toss_win_match_win'][venue_id] / total_decided_matches) * 100
             
             # Bat first vs bowl first success rates
-            bat_first_wins = 0
-            bowl_first_wins = 0
-            bat_first_matches = 0
-            bowl_first_matches = 0
-            
-            for i, decision in enumerate(stats['toss_decisions']):
-                if i < len(stats['match_winners']) and stats['match_winners'][i] != 'No Result':
-                    if decision == 'bat':
-                        bat_first_matches += 1
-                        if stats['match_winners'][i] == stats['toss_winners'][i]:
-                            bat_first_wins += 1
-                    elif decision == 'field':
-                        bowl_first_matches += 1
-                        if stats['match_winners'][i] == stats['toss_winners'][i]:
-                            bowl_first_wins += 1
-            
+            bat_first_matches = match_counts['bat_first'][venue_id]
+            bowl_first_matches = match_counts['bowl_first'][venue_id]
             if bat_first_matches > 0:
-                venue_summary[venue]['bat_first_win_rate'] = (bat_first_wins / bat_first_matches) * 100
+                venue_summary[venue]['bat_first_win_rate'] = (match_counts['bat_first_wins'][venue_id] / bat_first_matches) * 100
             if bowl_first_matches > 0:
-                venue_summary[venue]['bowl_first_win_rate'] = (bowl_first_wins / bowl_first_matches) * 100
+                venue_summary[venue]['bowl_first_win_rate'] = (match_counts['bowl_first_wins'][venue_id] / bowl_first_matches) * 100
             
             # Add ball outcome probabilities for Markov chain modeling
             if stats['total_balls'] > 0:
-                for runs in range(7):  # 0-6 runs
-                    count = 0
-                    # Count occurrences of each run outcome for this venue
-                    for data in data_list:
-                        if data.get('info', {}).get('venue', 'Unknown Venue') == venue:
-                            for inning in data.get('innings', []):
-                                for over in inning.get('overs', []):
-                                    for delivery in over.get('deliveries', []):
-                                        if 'extras' not in delivery or not any(k in delivery['extras'] for k in ['wides', 'noballs']):
-                                            if delivery['runs']['batter'] == runs:
-                                                count += 1
-                    venue_summary[venue][f'runs_{runs}_probability'] = (count / stats['total_balls']) * 100 if stats['total_balls'] > 0 else 0
+                venue_summary[venue].update(runs_probabilities(all_innings['runs_counts'][venue_id], stats['total_balls']))
     
     return venue_summary
 
-def calculate_team_wise_stats(data_list):
+def _new_team_stats():
+    """Empty per-team accumulators for calculate_team_wise_stats."""
+    return {
+        'matches_played': 0,
+        'matches_won': 0,
+        'matches_lost': 0,
+        'no_results': 0,
+        'toss_won': 0,
+        'toss_won_match_won': 0,
+        'bat_first_matches': 0,
+        'bat_first_wins': 0,
+        'bowl_first_matches': 0,
+        'bowl_first_wins': 0,
+        'total_runs_scored': 0,
+        'total_runs_conceded': 0,
+        'total_balls_faced': 0,
+        'total_balls_bowled': 0,
+        'total_wickets_lost': 0,
+        'total_wickets_taken': 0,
+        'total_fours_hit': 0,
+        'total_sixes_hit': 0,
+        'total_dots_faced': 0,
+        'total_dots_bowled': 0,
+        'venues_played': [],  # One entry per match; de-duplicated in the summary
+        'opponents_faced': []
+    }
+
+def calculate_team_wise_stats(data_list, deliveries=None):
     """
     Calculate comprehensive team-wise statistics for cricket matches.
     
     Args:
         data_list: List of cricket match data (JSON format)
+        deliveries: flatten_deliveries(data_list), if already computed
     
     Returns:
         dict: Team-wise statistics including batting, bowling, and match outcomes
     """
-    team_stats = {}
+    team_stats = defaultdict(_new_team_stats)
+    if deliveries is None:
+        deliveries = flatten_deliveries(data_list)
+    innings_totals = calculate_innings_totals(deliveries)
+    innings_offset = 0  # Innings are numbered in data_list order, as in flatten_deliveries
+    # Batting and bowling team of each innings, None when the innings is not counted for that side
+    innings_batting = [None] * len(deliveries['innings_match'])
+    innings_bowling = [None] * len(deliveries['innings_match'])
     
     for data in data_list:
         info = data.get('info', {})
@@ -304,50 +480,13 @@ def calculate_team_wise_stats(data_list):
         toss_winner = info.get('toss', {}).get('winner', 'Unknown')
         toss_decision = info.get('toss', {}).get('decision', 'Unknown')
         
-        # Initialize team stats if not exists
-        for team in teams:
-            if team not in team_stats:
-                team_stats[team] = {
-                    'matches_played': 0,
-                    'matches_won': 0,
-                    'matches_lost': 0,
-                    'no_results': 0,
-                    'toss_won': 0,
-                    'toss_won_match_won': 0,
-                    'bat_first_matches': 0,
-                    'bat_first_wins': 0,
-                    'bowl_first_matches': 0,
-                    'bowl_first_wins': 0,
-                    'total_runs_scored': 0,
-                    'total_runs_conceded': 0,
-                    'total_balls_faced': 0,
-                    'total_balls_bowled': 0,
-                    'total_wickets_lost': 0,
-                    'total_wickets_taken': 0,
-                    'total_fours_hit': 0,
-                    'total_sixes_hit': 0,
-                    'total_dots_faced': 0,
-                    'total_dots_bowled': 0,
-                    'innings_scores': [],
-                    'powerplay_runs_scored': [],
-                    'powerplay_runs_conceded': [],
-                    'death_over_runs_scored': [],
-                    'death_over_runs_conceded': [],
-                    'highest_score': 0,
-                    'lowest_score': float('inf'),
-                    'venues_played': set(),
-                    'opponents_faced': set()
-                }
-        
         # Update match results
         for team in teams:
             team_stats[team]['matches_played'] += 1
-            team_stats[team]['venues_played'].add(info.get('venue', 'Unknown'))
+            team_stats[team]['venues_played'].append(info.get('venue', 'Unknown'))
             
             # Add opponents
-            opponents = [t for t in teams if t != team]
-            for opponent in opponents:
-                team_stats[team]['opponents_faced'].add(opponent)
+            team_stats[team]['opponents_faced'].extend(t for t in teams if t != team)
             
             if winner == team:
                 team_stats[team]['matches_won'] += 1
@@ -373,95 +512,56 @@ def calculate_team_wise_stats(data_list):
                         team_stats[team]['bowl_first_wins'] += 1
         
         # Process innings data
-        for inning_idx, inning in enumerate(data.get('innings', [])):
+        innings = data.get('innings', [])
+        two_teams = len(teams) == 2
+        for inning_idx, inning in enumerate(innings):
+            innings_id = innings_offset + inning_idx
             batting_team = inning.get('team', 'Unknown')
-            bowling_team = None
             
-            # Find bowling team
-            for team in teams:
-                if team != batting_team:
-                    bowling_team = team
-                    break
+            # Find bowling team; in the usual two-team match it is simply the other side
+            if two_teams:
+                bowling_team = teams[1] if batting_team == teams[0] else teams[0]
+            else:
+                bowling_team = next((team for team in teams if team != batting_team), None)
             
             if batting_team in team_stats:
-                inning_runs = 0
-                inning_balls = 0
-                inning_wickets = 0
-                inning_fours = 0
-                inning_sixes = 0
-                inning_dots = 0
-                powerplay_runs = 0
-                death_over_runs = 0
-                
-                for over in inning.get('overs', []):
-                    over_num = over.get('over', 0)
-                    
-                    for delivery in over.get('deliveries', []):
-                        # Skip extras for ball count
-                        if 'extras' not in delivery or not any(k in delivery['extras'] for k in ['wides', 'noballs']):
-                            inning_balls += 1
-                            team_stats[batting_team]['total_balls_faced'] += 1
-                            if bowling_team and bowling_team in team_stats:
-                                team_stats[bowling_team]['total_balls_bowled'] += 1
-                        
-                        runs = delivery['runs']['batter']
-                        total_runs = delivery['runs']['total']
-                        
-                        inning_runs += total_runs
-                        team_stats[batting_team]['total_runs_scored'] += total_runs
-                        if bowling_team and bowling_team in team_stats:
-                            team_stats[bowling_team]['total_runs_conceded'] += total_runs
-                        
-                        if runs == 0:
-                            inning_dots += 1
-                            team_stats[batting_team]['total_dots_faced'] += 1
-                            if bowling_team and bowling_team in team_stats:
-                                team_stats[bowling_team]['total_dots_bowled'] += 1
-                        elif runs == 4:
-                            inning_fours += 1
-                            team_stats[batting_team]['total_fours_hit'] += 1
-                        elif runs == 6:
-                            inning_sixes += 1
-                            team_stats[batting_team]['total_sixes_hit'] += 1
-                        
-                        if 'wickets' in delivery:
-                            inning_wickets += 1
-                            team_stats[batting_team]['total_wickets_lost'] += 1
-                            if bowling_team and bowling_team in team_stats:
-                                team_stats[bowling_team]['total_wickets_taken'] += 1
-                        
-                        # Phase-wise runs
-                        if over_num < 6:  # Powerplay
-                            powerplay_runs += total_runs
-                        elif over_num >= 15:  # Death overs
-                            death_over_runs += total_runs
-                
-                # Store innings data
-                team_stats[batting_team]['innings_scores'].append(inning_runs)
-                team_stats[batting_team]['powerplay_runs_scored'].append(powerplay_runs)
-                team_stats[batting_team]['death_over_runs_scored'].append(death_over_runs)
-                
+                innings_batting[innings_id] = batting_team
                 if bowling_team and bowling_team in team_stats:
-                    team_stats[bowling_team]['powerplay_runs_conceded'].append(powerplay_runs)
-                    team_stats[bowling_team]['death_over_runs_conceded'].append(death_over_runs)
-                
-                # Update highest/lowest scores
-                if inning_runs > team_stats[batting_team]['highest_score']:
-                    team_stats[batting_team]['highest_score'] = inning_runs
-                if inning_runs < team_stats[batting_team]['lowest_score']:
-                    team_stats[batting_team]['lowest_score'] = inning_runs
+                    innings_bowling[innings_id] = bowling_team
+        innings_offset += len(innings)
+    
+    # Per-team batting and bowling totals, summed over the innings on each side
+    team_ids = {team: team_id for team_id, team in enumerate(team_stats)}
+    innings_batting = np.array([team_ids.get(team, -1) for team in innings_batting], dtype=np.intp)
+    innings_bowling = np.array([team_ids.get(team, -1) for team in innings_bowling], dtype=np.intp)
+    batting_innings = summarize_innings_by_group(innings_totals, innings_batting, len(team_stats))
+    bowling_innings = summarize_innings_by_group(innings_totals, innings_bowling, len(team_stats))
     
     # Calculate derived statistics
     team_summary = {}
     for team, stats in team_stats.items():
         if stats['matches_played'] > 0:
-            # Convert sets to counts
-            stats['venues_played'] = len(stats['venues_played'])
-            stats['opponents_faced'] = len(stats['opponents_faced'])
+            team_id = team_ids[team]
+            batting, bowling = batting_innings['totals'][team_id], bowling_innings['totals'][team_id]
+            batted, bowled = batting_innings['innings'][team_id], bowling_innings['innings'][team_id]
+            stats.update({
+                'total_runs_scored': batting[RUNS],
+                'total_runs_conceded': bowling[RUNS],
+                'total_balls_faced': batting[BALLS],
+                'total_balls_bowled': bowling[BALLS],
+                'total_wickets_lost': batting[WICKETS],
+                'total_wickets_taken': bowling[WICKETS],
+                'total_fours_hit': batting[FOURS],
+                'total_sixes_hit': batting[SIXES],
+                'total_dots_faced': batting[DOTS],
+                'total_dots_bowled': bowling[DOTS]
+            })
             
-            # Fix lowest score if no valid scores
-            if stats['lowest_score'] == float('inf'):
-                stats['lowest_score'] = 0
+            # Convert the collected names to distinct counts
+            stats['venues_played'] = len(set(stats['venues_played']))
+            stats['opponents_faced'] = len(set(stats['opponents_faced']))
+            stats['highest_score'] = batting_innings['highest'][team_id]
+            stats['lowest_score'] = batting_innings['lowest'][team_id]
             
             team_summary[team] = {
                 **stats,
@@ -471,116 +571,78 @@ def calculate_team_wise_stats(data_list):
                 'toss_win_match_win_rate': (stats['toss_won_match_won'] / stats['toss_won']) * 100 if stats['toss_won'] > 0 else 0,
                 'bat_first_win_rate': (stats['bat_first_wins'] / stats['bat_first_matches']) * 100 if stats['bat_first_matches'] > 0 else 0,
                 'bowl_first_win_rate': (stats['bowl_first_wins'] / stats['bowl_first_matches']) * 100 if stats['bowl_first_matches'] > 0 else 0,
-                'avg_score': sum(stats['innings_scores']) / len(stats['innings_scores']) if stats['innings_scores'] else 0,
+                'avg_score': batting[RUNS] / batted if batted else 0,
                 'avg_runs_per_ball': stats['total_runs_scored'] / stats['total_balls_faced'] if stats['total_balls_faced'] > 0 else 0,
                 'avg_run_rate': (stats['total_runs_scored'] / stats['total_balls_faced'] * 6) if stats['total_balls_faced'] > 0 else 0,
                 'strike_rate': (stats['total_runs_scored'] / stats['total_balls_faced'] * 100) if stats['total_balls_faced'] > 0 else 0,
                 'dot_ball_percentage': (stats['total_dots_faced'] / stats['total_balls_faced'] * 100) if stats['total_balls_faced'] > 0 else 0,
                 'boundary_percentage': ((stats['total_fours_hit'] + stats['total_sixes_hit']) / stats['total_balls_faced'] * 100) if stats['total_balls_faced'] > 0 else 0,
-                'avg_powerplay_runs': sum(stats['powerplay_runs_scored']) / len(stats['powerplay_runs_scored']) if stats['powerplay_runs_scored'] else 0,
-                'avg_death_over_runs': sum(stats['death_over_runs_scored']) / len(stats['death_over_runs_scored']) if stats['death_over_runs_scored'] else 0,
+                'avg_powerplay_runs': batting[POWERPLAY_RUNS] / batted if batted else 0,
+                'avg_death_over_runs': batting[DEATH_OVER_RUNS] / batted if batted else 0,
                 'bowling_avg_runs_conceded': stats['total_runs_conceded'] / stats['total_balls_bowled'] * 6 if stats['total_balls_bowled'] > 0 else 0,
                 'bowling_strike_rate': stats['total_balls_bowled'] / stats['total_wickets_taken'] if stats['total_wickets_taken'] > 0 else 0,
                 'bowling_economy': stats['total_runs_conceded'] / (stats['total_balls_bowled'] / 6) if stats['total_balls_bowled'] > 0 else 0,
-                'avg_powerplay_runs_conceded': sum(stats['powerplay_runs_conceded']) / len(stats['powerplay_runs_conceded']) if stats['powerplay_runs_conceded'] else 0,
-                'avg_death_over_runs_conceded': sum(stats['death_over_runs_conceded']) / len(stats['death_over_runs_conceded']) if stats['death_over_runs_conceded'] else 0,
+                'avg_powerplay_runs_conceded': bowling[POWERPLAY_RUNS] / bowled if bowled else 0,
+                'avg_death_over_runs_conceded': bowling[DEATH_OVER_RUNS] / bowled if bowled else 0,
                 'wicket_percentage_per_ball': (stats['total_wickets_lost'] / stats['total_balls_faced'] * 100) if stats['total_balls_faced'] > 0 else 0,
             }
             
             # Add ball outcome probabilities for Markov chain modeling
             if stats['total_balls_faced'] > 0:
-                for runs in range(7):  # 0-6 runs
-                    count = 0
-                    # Count occurrences of each run outcome for this team
-                    for data in data_list:
-                        for inning in data.get('innings', []):
-                            if inning.get('team') == team:  # Only count when this team is batting
-                                for over in inning.get('overs', []):
-                                    for delivery in over.get('deliveries', []):
-                                        if 'extras' not in delivery or not any(k in delivery['extras'] for k in ['wides', 'noballs']):
-                                            if delivery['runs']['batter'] == runs:
-                                                count += 1
-                    team_summary[team][f'runs_{runs}_probability'] = (count / stats['total_balls_faced']) * 100 if stats['total_balls_faced'] > 0 else 0
+                team_summary[team].update(runs_probabilities(batting_innings['runs_counts'][team_id], stats['total_balls_faced']))
     
     return team_summary
 
-def calculate_markov_chain_stats(data_list, team_wise=False):
+def calculate_markov_chain_stats(data_list, team_wise=False, deliveries=None):
     """
     Calculate statistical summaries useful for Markov chain cricket simulation.
     
     Args:
         data_list: List of cricket match data (JSON format)
+        team_wise: Whether to include per-team statistics
+        deliveries: flatten_deliveries(data_list), if already computed
     
     Returns:
         dict: Statistical summaries including runs per ball, run rates, and percentages
     """
-    all_deliveries = []
+    if deliveries is None:
+        deliveries = flatten_deliveries(data_list)
     
-    # New counters for detailed over-level boundary stats
-    fours_in_over_counts = {0: 0, 1: 0, 2: 0, '3+': 0}
-    sixes_in_over_counts = {0: 0, 1: 0, 2: 0, '3+': 0}
-    both_in_over_counts = {0: 0, 1: 0, 2: 0, '3+': 0} # Combined fours and sixes
-    total_overs = 0
-
-    # Extract all deliveries from all matches
-    for data in data_list:
-        for inning in data.get('innings', []):
-            inning_team = inning.get('team', 'Unknown')
-            for over in inning.get('overs', []):
-                total_overs += 1
-                over_num = over.get('over', 0)
-                fours_this_over = 0
-                sixes_this_over = 0
-                
-                for ball_num, delivery in enumerate(over.get('deliveries', [])):
-                    # Skip extras (wides, no-balls) for ball-by-ball analysis
-                    if 'extras' not in delivery or not any(k in delivery['extras'] for k in ['wides', 'noballs']):
-                        is_four = delivery['runs']['batter'] == 4
-                        is_six = delivery['runs']['batter'] == 6
-                        if is_four:
-                            fours_this_over += 1
-                        if is_six:
-                            sixes_this_over += 1
-
-                        delivery_info = {
-                            'team': inning_team,
-                            'over': over_num,
-                            'ball': ball_num + 1,
-                            'runs_off_bat': delivery['runs']['batter'],
-                            'total_runs': delivery['runs']['total'],
-                            'extras': delivery['runs']['extras'],
-                            'is_wicket': 'wickets' in delivery,
-                            'is_four': is_four,
-                            'is_six': is_six,
-                            'is_dot': delivery['runs']['total'] == 0,
-                            'is_single': delivery['runs']['batter'] == 1,
-                            'phase': 'powerplay' if over_num < 6 else 'middle' if over_num < 15 else 'death'
-                        }
-                        all_deliveries.append(delivery_info)
-                
-                # Categorize and count for fours
-                if fours_this_over == 0: fours_in_over_counts[0] += 1
-                elif fours_this_over == 1: fours_in_over_counts[1] += 1
-                elif fours_this_over == 2: fours_in_over_counts[2] += 1
-                else: fours_in_over_counts['3+'] += 1
-
-                # Categorize and count for sixes
-                if sixes_this_over == 0: sixes_in_over_counts[0] += 1
-                elif sixes_this_over == 1: sixes_in_over_counts[1] += 1
-                elif sixes_this_over == 2: sixes_in_over_counts[2] += 1
-                else: sixes_in_over_counts['3+'] += 1
-                
-                # Categorize and count for combined boundaries
-                both_this_over = fours_this_over + sixes_this_over
-                if both_this_over == 0: both_in_over_counts[0] += 1
-                elif both_this_over == 1: both_in_over_counts[1] += 1
-                elif both_this_over == 2: both_in_over_counts[2] += 1
-                else: both_in_over_counts['3+'] += 1
-
-    if not all_deliveries:
+    # Skip extras (wides, no-balls) for ball-by-ball analysis
+    is_legal = deliveries['is_legal']
+    total_balls = int(np.count_nonzero(is_legal))
+    if not total_balls:
         return {"error": "No valid deliveries found in the data"}
     
-    total_balls = len(all_deliveries)
+    over_ids = deliveries['over_id'][is_legal]
+    team_ids = deliveries['innings_team'][deliveries['over_innings'][over_ids]]
+    phase_ids = over_phase_ids(deliveries['over_number'])[over_ids]
+    runs_bat = deliveries['runs_off_bat'][is_legal]
+    runs_tot = deliveries['total_runs'][is_legal]
+    is_wicket = deliveries['is_wicket'][is_legal]
+    team_index = {team: team_id for team_id, team in enumerate(deliveries['teams'])}
+    
+    # Over-level boundary counts, bucketed into overs with 0, 1, 2 or 3+ boundaries
+    total_overs = len(deliveries['over_number'])
+    fours_per_over = np.bincount(over_ids, weights=runs_bat == 4, minlength=total_overs)
+    sixes_per_over = np.bincount(over_ids, weights=runs_bat == 6, minlength=total_overs)
+    
+    def count_overs(per_over):
+        buckets = np.bincount(np.minimum(per_over, 3).astype(np.intp), minlength=4)
+        return dict(zip((0, 1, 2, '3+'), buckets.tolist()))
+    
+    fours_in_over_counts = count_overs(fours_per_over)
+    sixes_in_over_counts = count_overs(sixes_per_over)
+    both_in_over_counts = count_overs(fours_per_over + sixes_per_over) # Combined fours and sixes
+    
+    # Outcome counts per batting team; the overall counts are their sum
+    team_hist, team_dots, team_wickets = count_ball_outcomes(team_ids, len(team_index), phase_ids, runs_bat, runs_tot == 0, is_wicket)
+    runs_hist, phase_dots, phase_wickets = team_hist.sum(axis=0), team_dots.sum(axis=0), team_wickets.sum(axis=0)
+    runs_counts = runs_hist.sum(axis=0)
+    avg_runs_per_ball = (runs_counts @ np.arange(runs_counts.size)) / total_balls
+    avg_total_runs_per_ball = runs_tot.mean()
+    wicket_count = int(phase_wickets.sum())
+    boundary_count = int(runs_counts[4] + runs_counts[6])
     
     # Calculate basic statistics
     stats = {
@@ -588,19 +650,19 @@ def calculate_markov_chain_stats(data_list, team_wise=False):
         'total_matches': len(data_list),
         
         # Runs per ball statistics
-        'avg_runs_per_ball': sum(d['runs_off_bat'] for d in all_deliveries) / total_balls,
-        'avg_total_runs_per_ball': sum(d['total_runs'] for d in all_deliveries) / total_balls,
+        'avg_runs_per_ball': avg_runs_per_ball,
+        'avg_total_runs_per_ball': avg_total_runs_per_ball,
         
         # Run rate (runs per over)
-        'avg_run_rate': (sum(d['runs_off_bat'] for d in all_deliveries) / total_balls) * 6,
-        'avg_total_run_rate': (sum(d['total_runs'] for d in all_deliveries) / total_balls) * 6,
+        'avg_run_rate': avg_runs_per_ball * 6,
+        'avg_total_run_rate': avg_total_runs_per_ball * 6,
         
         # Ball outcome percentages
-        'dot_ball_percentage': (sum(1 for d in all_deliveries if d['is_dot']) / total_balls) * 100,
-        'single_percentage': (sum(1 for d in all_deliveries if d['is_single']) / total_balls) * 100,
-        'four_percentage': (sum(1 for d in all_deliveries if d['is_four']) / total_balls) * 100,
-        'six_percentage': (sum(1 for d in all_deliveries if d['is_six']) / total_balls) * 100,
-        'wicket_percentage': (sum(1 for d in all_deliveries if d['is_wicket']) / total_balls) * 100,
+        'dot_ball_percentage': (phase_dots.sum() / total_balls) * 100,
+        'single_percentage': (runs_counts[1] / total_balls) * 100,
+        'four_percentage': (runs_counts[4] / total_balls) * 100,
+        'six_percentage': (runs_counts[6] / total_balls) * 100,
+        'wicket_percentage': (wicket_count / total_balls) * 100,
         
         # Phase-wise statistics (useful for Markov states)
         'powerplay_stats': {},
@@ -615,63 +677,30 @@ def calculate_markov_chain_stats(data_list, team_wise=False):
     }
     
     # Calculate phase-wise statistics
-    for phase in ['powerplay', 'middle', 'death']:
-        phase_deliveries = [d for d in all_deliveries if d['phase'] == phase]
-        if phase_deliveries:
-            phase_balls = len(phase_deliveries)
-            phase_stats = {
-                'balls': phase_balls,
-                'avg_runs_per_ball': sum(d['runs_off_bat'] for d in phase_deliveries) / phase_balls,
-                'run_rate': (sum(d['runs_off_bat'] for d in phase_deliveries) / phase_balls) * 6,
-                'dot_ball_percentage': (sum(1 for d in phase_deliveries if d['is_dot']) / phase_balls) * 100,
-                'single_percentage': (sum(1 for d in phase_deliveries if d['is_single']) / phase_balls) * 100,
-                'four_percentage': (sum(1 for d in phase_deliveries if d['is_four']) / phase_balls) * 100,
-                'six_percentage': (sum(1 for d in phase_deliveries if d['is_six']) / phase_balls) * 100,
-                'wicket_percentage': (sum(1 for d in phase_deliveries if d['is_wicket']) / phase_balls) * 100
-            }
+    for phase, phase_stats in calculate_phase_stats(runs_hist, phase_dots, phase_wickets).items():
+        if phase_stats:
             stats[f'{phase}_stats'] = phase_stats
     
     # Transition probabilities for Markov chain (runs scored on current ball)
-    runs_distribution = {}
-    for runs in range(7):  # 0-6 runs
-        count = sum(1 for d in all_deliveries if d['runs_off_bat'] == runs)
-        runs_distribution[f'runs_{runs}_probability'] = (count / total_balls) * 100
-    
-    stats.update(runs_distribution)
+    stats.update(runs_probabilities(runs_counts, total_balls))
     
     # Wicket fall patterns (useful for state transitions)
-    wicket_balls = [d for d in all_deliveries if d['is_wicket']]
-    if wicket_balls:
-        stats['avg_balls_between_wickets'] = total_balls / len(wicket_balls)
+    if wicket_count:
+        stats['avg_balls_between_wickets'] = total_balls / wicket_count
     
     # Boundary patterns
-    boundary_balls = [d for d in all_deliveries if d['is_four'] or d['is_six']]
-    if boundary_balls:
-        stats['boundary_percentage'] = (len(boundary_balls) / total_balls) * 100
-        stats['avg_balls_between_boundaries'] = total_balls / len(boundary_balls)
-    
-    # First over and first 6 overs analysis
-    first_over_runs = []
-    first_6_overs_runs = []
+    if boundary_count:
+        stats['boundary_percentage'] = (boundary_count / total_balls) * 100
+        stats['avg_balls_between_boundaries'] = total_balls / boundary_count
     
-    for data in data_list:
-        for inning in data.get('innings', []):
-            first_over_total = 0
-            first_6_overs_total = 0
-            
-            for over in inning.get('overs', []):
-                over_num = over.get('over', 0)
-                over_runs = sum(d['runs']['total'] for d in over.get('deliveries', []))
-                
-                if over_num == 0:  # First over (0-indexed)
-                    first_over_total = over_runs
-                    first_over_runs.append(over_runs)
-                
-                if over_num < 6:  # First 6 overs (powerplay)
-                    first_6_overs_total += over_runs
-            
-            if first_6_overs_total > 0:
-                first_6_overs_runs.append(first_6_overs_total)
+    # First over and first 6 overs analysis, from per-over totals of all deliveries
+    n_innings = len(deliveries['innings_match'])
+    over_number = deliveries['over_number']
+    over_runs = np.bincount(deliveries['over_id'], weights=deliveries['total_runs'], minlength=total_overs).astype(np.int64)
+    first_over_runs = over_runs[over_number == 0].tolist()
+    in_first_6 = over_number < 6
+    first_6_overs_totals = np.bincount(deliveries['over_innings'][in_first_6], weights=over_runs[in_first_6], minlength=n_innings).astype(np.int64)
+    first_6_overs_runs = first_6_overs_totals[first_6_overs_totals > 0].tolist()
     
     # Calculate first over and first 6 overs statistics
     if first_over_runs:
@@ -688,120 +717,377 @@ def calculate_markov_chain_stats(data_list, team_wise=False):
     
     # If team-wise analysis is requested, add team-specific statistics
     if team_wise:
-        unique_teams = list(set(d['team'] for d in all_deliveries))
-        stats['teams_analyzed'] = unique_teams
+        stats['teams_analyzed'] = [team for team, team_id in team_index.items() if team_hist[team_id].any()]
         stats['team_stats'] = {}
         
-        for team in unique_teams:
-            team_data = calculate_team_stats(all_deliveries, team)
+        for team in stats['teams_analyzed']:
+            team_id = team_index[team]
+            team_data = calculate_team_stats(team, team_hist[team_id], team_dots[team_id], team_wickets[team_id])
             if team_data:
                 stats['team_stats'][team] = team_data
     
     return stats
 
-def to_csv(df):
-    """Converts a DataFrame to a CSV string for downloading."""
-    return df.to_csv(index=False).encode('utf-8')
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_flatten_deliveries(uploads_key, _data_list):
+    """
+    Cached flatten_deliveries, so reruns reuse the per-ball arrays instead of walking the JSON.
+    
+    Args:
+        uploads_key: Hashable identifier of the uploaded files that produced _data_list
+        _data_list: List of cricket match data (excluded from hashing)
+    
+    Returns:
+        dict: Same as flatten_deliveries
+    """
+    return flatten_deliveries(_data_list)
 
-@st.cache_data
-def get_player_summaries_single_match(data):
-    """Creates DataFrames for player batting and bowling summaries for a single match."""
-    info = data.get('info', {})
-    player_stats = {p: {'team': t, 'runs': 0, 'balls_faced': 0, 'fours': 0, 'sixes': 0, 'runs_conceded': 0, 'balls_bowled': 0, 'wickets': 0} for t, ps in info.get('players', {}).items() for p in ps}
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_markov_chain_stats(uploads_key, team_wise, _data_list, _deliveries=None):
+    """
+    Cached calculate_markov_chain_stats, so switching views does not recompute it.
+    
+    Args:
+        uploads_key: Hashable identifier of the uploaded files that produced _data_list
+        team_wise: Whether to include per-team statistics
+        _data_list: List of cricket match data (excluded from hashing)
+        _deliveries: flatten_deliveries(_data_list), if already computed (excluded from hashing)
+    
+    Returns:
+        dict: Same as calculate_markov_chain_stats
+    """
+    return calculate_markov_chain_stats(_data_list, team_wise=team_wise, deliveries=_deliveries)
 
-    for inning in data.get('innings', []):
-        for over in inning.get('overs', []):
-            for delivery in over.get('deliveries', []):
-                batter, bowler = delivery.get('batter'), delivery.get('bowler')
-                
-                if batter in player_stats:
-                    player_stats[batter]['runs'] += delivery['runs']['batter']
-                    player_stats[batter]['balls_faced'] += 1
-                    if delivery['runs']['batter'] == 4: player_stats[batter]['fours'] += 1
-                    if delivery['runs']['batter'] == 6: player_stats[batter]['sixes'] += 1
-                
-                if bowler in player_stats:
-                    player_stats[bowler]['runs_conceded'] += delivery['runs']['total']
-                    player_stats[bowler]['balls_bowled'] += 1
-                    if 'wickets' in delivery: player_stats[bowler]['wickets'] += 1
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_venue_wise_stats(uploads_key, _data_list, _deliveries=None):
+    """
+    Cached calculate_venue_wise_stats, so widget changes on the venue view do not recompute it.
+    
+    Args:
+        uploads_key: Hashable identifier of the uploaded files that produced _data_list
+        _data_list: List of cricket match data (excluded from hashing)
+        _deliveries: flatten_deliveries(_data_list), if already computed (excluded from hashing)
+    
+    Returns:
+        dict: Same as calculate_venue_wise_stats
+    """
+    return calculate_venue_wise_stats(_data_list, deliveries=_deliveries)
 
-    batting_records = [{'player_name': p, **s} for p, s in player_stats.items() if s['balls_faced'] > 0]
-    bowling_records = [{'player_name': p, **s} for p, s in player_stats.items() if s['balls_bowled'] > 0]
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_team_wise_stats(uploads_key, _data_list, _deliveries=None):
+    """
+    Cached calculate_team_wise_stats, so widget changes on the team view do not recompute it.
     
-    batting_df = pd.DataFrame(batting_records)
-    bowling_df = pd.DataFrame(bowling_records)
+    Args:
+        uploads_key: Hashable identifier of the uploaded files that produced _data_list
+        _data_list: List of cricket match data (excluded from hashing)
+        _deliveries: flatten_deliveries(_data_list), if already computed (excluded from hashing)
     
-    if not batting_df.empty:
-        batting_df['strike_rate'] = (batting_df['runs'] / batting_df['balls_faced'].replace(0, 1) * 100).round(2)
-    if not bowling_df.empty:
-        bowling_df['overs'] = bowling_df['balls_bowled'].apply(lambda x: f"{int(x // 6)}.{int(x % 6)}")
-        bowling_df['economy_rate'] = (bowling_df['runs_conceded'] / (bowling_df['balls_bowled'].replace(0, 1) / 6)).round(2)
+    Returns:
+        dict: Same as calculate_team_wise_stats
+    """
+    return calculate_team_wise_stats(_data_list, deliveries=_deliveries)
 
-    return batting_df.sort_values('runs', ascending=False), bowling_df.sort_values('wickets', ascending=False)
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_betting_markets(uploads_key, _data_list):
+    """
+    Cached calculate_betting_markets plus its display formatting; requires BETTING_MARKETS_AVAILABLE.
+    
+    Args:
+        uploads_key: Hashable identifier of the uploaded files that produced _data_list
+        _data_list: List of cricket match data (excluded from hashing)
+    
+    Returns:
+        tuple: (calculate_betting_markets result, format_betting_markets_for_display result)
+    """
+    betting_markets = calculate_betting_markets(_data_list)
+    return betting_markets, format_betting_markets_for_display(betting_markets)
 
-def get_betting_market_summary_dict(data):
-    """Generates a dictionary of betting market outcomes for a single match with standardized keys."""
-    info = data.get('info', {})
-    innings = data.get('innings', [])
-    batting_df, bowling_df = get_player_summaries_single_match(data)
+# Figure objects are shared, not copied: unpickling them from cache_data costs more than rebuilding
+@st.cache_resource(show_spinner=False, max_entries=4)
+def cached_team_phase_figures(uploads_key, _team_frame):
+    """
+    Phase-wise runs scored and conceded bar charts for the Team-wise page, built once per upload set.
     
-    winner = info.get('outcome', {}).get('winner', 'No Result')
+    Args:
+        uploads_key: Hashable identifier of the uploaded files that produced _team_frame
+        _team_frame: Per-team statistics frame indexed by team (excluded from hashing)
+    
+    Returns:
+        list: Plotly figures for runs scored and runs conceded, one bar trace per phase
+    """
+    import plotly.graph_objects as go  # Deferred: only needed once a chart is drawn
+    phase_columns = {
+        'Runs Scored': (('Powerplay', 'avg_powerplay_runs'), ('Death Overs', 'avg_death_over_runs')),
+        'Runs Conceded': (('Powerplay', 'avg_powerplay_runs_conceded'), ('Death Overs', 'avg_death_over_runs_conceded'))
+    }
+    team_names = _team_frame.index.to_numpy()
+    figures = []
+    for runs_col, phases in phase_columns.items():
+        figures.append(go.Figure(
+            [
+                go.Bar(x=team_names, y=_team_frame[column].to_numpy(), name=phase,
+                       hovertemplate=f'Phase={phase}<br>Team=%{{x}}<br>{runs_col}=%{{y}}<extra></extra>')
+                for phase, column in phases
+            ],
+            layout=dict(
+                title=f'Phase-wise {runs_col} by Team', barmode='group', legend_title_text='Phase',
+                xaxis=dict(title='Team', tickangle=45), yaxis_title=runs_col
+            )
+        ))
+    return figures
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def cached_read_csv(file_id, _csv_file):
+    """Parses an uploaded CSV once per upload rather than on every rerun.
+
+    Uses pandas' default C parser, like the preview, so both show the same column types
+    (the pyarrow engine would turn ISO date columns into date objects).
+
+    Args:
+        file_id: Streamlit file_id of the upload, used as the cache key
+        _csv_file: The uploaded CSV file (not hashed)
+
+    Returns:
+        DataFrame of the CSV contents
+    """
+    return pd.read_csv(io.BytesIO(_csv_file.getvalue()))
 
+def arrow_csv_matches_pandas(col):
+    """
+    Whether Arrow writes a column's values exactly as DataFrame.to_csv would.
+    
+    Missing-free integers and strings (plain or categorical) are written the same way;
+    floats ('3' vs '3.0'), booleans ('true' vs 'True') and missing values are not.
+    """
+    dtype = col.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return col.cat.categories.dtype.kind in 'iuOT' and not col.hasnans
+    if dtype.kind in 'iu':
+        return not col.hasnans  # Nullable Int64 columns can hold NA
+    return pd.api.types.infer_dtype(col, skipna=False) == 'string' and not col.hasnans
+
+def to_csv(df):
+    """Converts a DataFrame to UTF-8 encoded CSV bytes for downloading, in DataFrame.to_csv's format with Unix line endings."""
+    buf = io.BytesIO()
+    # A single-column frame needs '""' for an empty value so the row is not read back as a blank line;
+    # Arrow would write an empty line, so such frames always go through pandas
+    if pa is not None and len(df.columns) > 1 and all(arrow_csv_matches_pandas(df[col]) for col in df.columns):
+        try:
+            # pandas writes (and quotes) the header; Arrow's C++ writer does the rows, always ending lines with '\n'
+            df.iloc[:0].to_csv(buf, index=False, encoding='utf-8', lineterminator='\n')
+            pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf, ARROW_CSV_OPTIONS)
+            return buf.getvalue()
+        except pa.ArrowException:
+            # e.g. strings with commas or quotes, which need quoting
+            buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding='utf-8', lineterminator='\n')
+    return buf.getvalue()
+
+# Streamlit 1.52 added callables for download_button data, which it only runs when the button is clicked
+DEFERRED_DOWNLOADS = tuple(int(part) for part in st.__version__.split('.')[:2]) >= (1, 52)
+
+def csv_download(df):
+    """Download-button data for a DataFrame as CSV, generated on click where Streamlit supports it."""
+    if DEFERRED_DOWNLOADS:
+        return lambda: to_csv(df)
+    return to_csv(df)
+
+# Ball-by-ball export columns; repeated strings are dictionary-encoded as categoricals and
+# integers are stored in the smallest type that holds the uploaded values (see downcast_integers)
+BALL_BY_BALL_DTYPES = {
+    'match_id': 'category',
+    'inning': 'integer',
+    'over': 'integer',
+    'ball': 'integer',
+    'batting_team': 'category',
+    'batter': 'category',
+    'bowler': 'category',
+    'runs_off_bat': 'integer',
+    'extras': 'integer',
+    'total_runs': 'integer'
+}
+
+def downcast_integers(values):
+    """Integer array of values in the smallest signed dtype that fits them, e.g. int16 for multi-day overs."""
+    return pd.to_numeric(np.asarray(values, dtype=np.int64), downcast='integer')
+
+# Ball-by-ball columns that hold one value per innings; the rest vary ball to ball
+INNINGS_BALL_COLUMNS = ('match_id', 'inning', 'batting_team')
+MATCH_SUMMARY_CATEGORIES = ['home_team', 'away_team', 'toss_winner', 'toss_decision', 'winner', 'venue']
+
+# Run buckets of the betting markets by 0-based over number: overs 1-6, 7-13 and 14-20
+OVER_RUN_BUCKETS = (0,) * 6 + (1,) * 7 + (2,) * 7
+
+def repeat_categorical(values, counts):
+    """Builds a Categorical of each value repeated counts times, hashing only the distinct values."""
+    categories = sorted(set(values))
+    category_codes = {value: code for code, value in enumerate(categories)}
+    codes = np.repeat(np.array([category_codes[value] for value in values], dtype=np.int32), counts)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+def scan_match(data):
+    """
+    Walk a single match's deliveries once and collect everything the per-match summaries need.
+    
+    Args:
+        data: Cricket match data (JSON format)
+    
+    Returns:
+        dict: Per-inning statistics, per-player counters, ball-by-ball columns and over-level flags.
+              The INNINGS_BALL_COLUMNS are left out of 'ball_by_ball'; 'ball_by_ball_innings'
+              holds (match_id, inning, batting_team, row count) for each innings instead.
+    """
+    info = data.get('info', {})
+    match_id = data.get('match_id', 'N/A')
+    player_stats = {p: {'team': t, 'runs': 0, 'balls_faced': 0, 'fours': 0, 'sixes': 0, 'runs_conceded': 0, 'balls_bowled': 0, 'wickets': 0} for t, ps in info.get('players', {}).items() for p in ps}
+    
     inning_stats = []
+    ball_rows = []
+    ball_by_ball_innings = []
     four_and_six_in_over = "No"
     overs_with_wicket = 0
-    for i, inning_data in enumerate(innings):
+    # Bound once for the per-delivery loop
+    get_player_stats, add_ball_row = player_stats.get, ball_rows.append
+    for i, inning_data in enumerate(data.get('innings', [])):
         stats = {'team': inning_data.get('team', f'Innings {i+1}'),'total_runs': 0,'powerplay_runs': 0,'runs_overs_7_13': 0, 'runs_overs_14_20': 0, 'highest_over': 0,'fall_of_1st_wicket': 'N/A', 'runs_per_over': [], 'first_over_runs': 0, 'first_6_overs_runs': 0, 'fours': 0, 'sixes': 0, 'wickets': 0, 'wides': 0}
         running_score = 0
         wicket_fell = False
+        fours = sixes = wickets = wides = 0
+        runs_per_over = stats['runs_per_over']
+        bucket_runs = [0, 0, 0]
+        inning_number = i + 1
+        inning_first_row = len(ball_rows)
         for over in inning_data.get('overs', []):
             over_num = over.get('over', -1)
-            over_runs = sum(d['runs']['total'] for d in over.get('deliveries', []))
+            over_runs = 0
+            has_four = has_six = has_wicket = False
+            deliveries = over.get('deliveries', [])
+            if deliveries:
+                over_label = over['over'] + 1
             
-            stats['runs_per_over'].append(over_runs)
-            if over_runs > stats['highest_over']: stats['highest_over'] = over_runs
-            
-            if over_num < 6: 
-                stats['powerplay_runs'] += over_runs
-                stats['first_6_overs_runs'] += over_runs
-            if over_num == 0:  # First over (0-indexed)
-                stats['first_over_runs'] = over_runs
-            if 6 <= over_num <= 12: stats['runs_overs_7_13'] += over_runs
-            if 13 <= over_num <= 19: stats['runs_overs_14_20'] += over_runs
-
-            has_four = any(d['runs']['batter'] == 4 for d in over.get('deliveries', []))
-            has_six = any(d['runs']['batter'] == 6 for d in over.get('deliveries', []))
-            if has_four and has_six: four_and_six_in_over = "Yes"
-            if any('wickets' in d for d in over.get('deliveries', [])): overs_with_wicket += 1
-                
-            # Count deliveries in this over for detailed stats
-            for delivery in over.get('deliveries', []):
-                runs = delivery['runs']['batter']
-                total_runs = delivery['runs']['total']
+            for ball_number, delivery in enumerate(deliveries, 1):
+                ball_runs = delivery['runs']
+                runs = ball_runs['batter']
+                total_runs = ball_runs['total']
+                over_runs += total_runs
                 
                 # Count fours and sixes
                 if runs == 4:
-                    stats['fours'] += 1
+                    fours += 1
+                    has_four = True
                 elif runs == 6:
-                    stats['sixes'] += 1
+                    sixes += 1
+                    has_six = True
                 
                 # Count wickets
-                if 'wickets' in delivery:
-                    stats['wickets'] += 1
+                is_wicket = 'wickets' in delivery
+                if is_wicket:
+                    wickets += 1
+                    has_wicket = True
                 
                 # Count wides
-                if 'extras' in delivery and 'wides' in delivery['extras']:
-                    stats['wides'] += delivery['extras']['wides']
+                extras = delivery.get('extras')
+                if extras is not None and 'wides' in extras:
+                    wides += extras['wides']
                 
                 # Track fall of first wicket
                 if not wicket_fell:
                     running_score += total_runs
-                    if 'wickets' in delivery:
+                    if is_wicket:
                         stats['fall_of_1st_wicket'] = running_score
                         wicket_fell = True
-        stats['total_runs'] = sum(d['runs']['total'] for o in inning_data.get('overs', []) for d in o.get('deliveries', []))
+                
+                # Player batting and bowling counters
+                batter, bowler = delivery.get('batter'), delivery.get('bowler')
+                batter_stats = get_player_stats(batter)
+                if batter_stats is not None:
+                    batter_stats['runs'] += runs
+                    batter_stats['balls_faced'] += 1
+                    if runs == 4: batter_stats['fours'] += 1
+                    elif runs == 6: batter_stats['sixes'] += 1
+                bowler_stats = get_player_stats(bowler)
+                if bowler_stats is not None:
+                    bowler_stats['runs_conceded'] += total_runs
+                    bowler_stats['balls_bowled'] += 1
+                    if is_wicket: bowler_stats['wickets'] += 1
+                
+                add_ball_row((over_label, ball_number, batter, bowler, runs, ball_runs['extras'], total_runs))
+            
+            runs_per_over.append(over_runs)
+            if 0 <= over_num < len(OVER_RUN_BUCKETS):
+                bucket_runs[OVER_RUN_BUCKETS[over_num]] += over_runs
+            if over_num == 0:  # First over (0-indexed)
+                stats['first_over_runs'] = over_runs
+            
+            if has_four and has_six: four_and_six_in_over = "Yes"
+            if has_wicket: overs_with_wicket += 1
+        stats.update({
+            'total_runs': sum(runs_per_over), 'highest_over': max(runs_per_over, default=0),
+            'powerplay_runs': bucket_runs[0], 'first_6_overs_runs': bucket_runs[0],
+            'runs_overs_7_13': bucket_runs[1], 'runs_overs_14_20': bucket_runs[2],
+            'fours': fours, 'sixes': sixes, 'wickets': wickets, 'wides': wides
+        })
         inning_stats.append(stats)
-        
+        if len(ball_rows) > inning_first_row:
+            ball_by_ball_innings.append((match_id, inning_number, inning_data['team'], len(ball_rows) - inning_first_row))
+    
+    # Transpose the rows into one list per column
+    ball_columns = [col for col in BALL_BY_BALL_DTYPES if col not in INNINGS_BALL_COLUMNS]
+    ball_values = zip(*ball_rows) if ball_rows else [()] * len(ball_columns)
+    
+    return {
+        'inning_stats': inning_stats,
+        'player_stats': player_stats,
+        'ball_by_ball': {col: list(values) for col, values in zip(ball_columns, ball_values)},
+        'ball_by_ball_innings': ball_by_ball_innings,
+        'four_and_six_in_over': four_and_six_in_over,
+        'overs_with_wicket': overs_with_wicket
+    }
+
+def build_player_summaries(player_stats):
+    """Creates sorted batting and bowling summary DataFrames from per-player counters."""
+    batting_records = [{'player_name': p, **s} for p, s in player_stats.items() if s['balls_faced'] > 0]
+    bowling_records = [{'player_name': p, **s} for p, s in player_stats.items() if s['balls_bowled'] > 0]
+    
+    batting_df = pd.DataFrame(batting_records)
+    bowling_df = pd.DataFrame(bowling_records)
+    
+    if not batting_df.empty:
+        balls_faced = batting_df['balls_faced'].to_numpy()
+        batting_df['strike_rate'] = (batting_df['runs'].to_numpy() / np.where(balls_faced == 0, 1, balls_faced) * 100).round(2)
+    if not bowling_df.empty:
+        bowling_df['overs'] = format_overs(bowling_df['balls_bowled'])
+        balls_bowled = bowling_df['balls_bowled'].to_numpy()
+        bowling_df['economy_rate'] = (bowling_df['runs_conceded'].to_numpy() / (np.where(balls_bowled == 0, 1, balls_bowled) / 6)).round(2)
+
+    return batting_df.sort_values('runs', ascending=False), bowling_df.sort_values('wickets', ascending=False)
+
+@st.cache_data
+def get_player_summaries_single_match(data):
+    """Creates DataFrames for player batting and bowling summaries for a single match."""
+    return build_player_summaries(scan_match(data)['player_stats'])
+
+def get_betting_market_summary_dict(data, scan=None):
+    """
+    Generates a dictionary of betting market outcomes for a single match with standardized keys.
+    
+    Pass the match's scan_match() result when it is already available so the
+    deliveries are not walked again.
+    """
+    info = data.get('info', {})
+    if scan is None:
+        scan = scan_match(data)
+    
+    # Top batsman straight from the player counters; max() keeps the first of tied players
+    top_batsman = max(((player, s['runs']) for player, s in scan['player_stats'].items() if s['balls_faced'] > 0),
+                      key=lambda b: b[1], default=('N/A', 'N/A'))
+    
+    winner = info.get('outcome', {}).get('winner', 'No Result')
+    inning_stats = scan['inning_stats']
+    four_and_six_in_over = scan['four_and_six_in_over']
+    overs_with_wicket = scan['overs_with_wicket']
+
     summary_dict = {
         'match_id': data.get('match_id', 'N/A'),
         'Match Winner': winner,
@@ -818,19 +1104,19 @@ def get_betting_market_summary_dict(data):
         'Innings 2 Runs (Overs 1-6)': inning_stats[1]['powerplay_runs'] if len(inning_stats) > 1 else 0,
         'Innings 2 Runs (Overs 7-13)': inning_stats[1]['runs_overs_7_13'] if len(inning_stats) > 1 else 0,
         'Innings 2 Runs (Overs 14-20)': inning_stats[1]['runs_overs_14_20'] if len(inning_stats) > 1 else 0,
-        'Top Batsman Match': batting_df.iloc[0]['player_name'] if not batting_df.empty else 'N/A',
-        'Top Batsman Runs': batting_df.iloc[0]['runs'] if not batting_df.empty else 'N/A',
+        'Top Batsman Match': top_batsman[0],
+        'Top Batsman Runs': top_batsman[1],
         'Man of the Match': info.get('player_of_match', ['N/A'])[0],
         'Toss Winner': info.get('toss', {}).get('winner', 'N/A'),
         'Four and Six in an Over': four_and_six_in_over,
         'Overs with a Wicket': overs_with_wicket,
         
         # Additional betting market statistics
-        'Max Over in Match': max([inning_stats[i]['highest_over'] for i in range(len(inning_stats))]) if inning_stats else 0,
-        'Match Fours': sum([inning_stats[i]['fours'] for i in range(len(inning_stats))]) if inning_stats else 0,
-        'Match Sixes': sum([inning_stats[i]['sixes'] for i in range(len(inning_stats))]) if inning_stats else 0,
-        'Match Wickets': sum([inning_stats[i]['wickets'] for i in range(len(inning_stats))]) if inning_stats else 0,
-        'Match Wides': sum([inning_stats[i]['wides'] for i in range(len(inning_stats))]) if inning_stats else 0,
+        'Max Over in Match': max((s['highest_over'] for s in inning_stats), default=0),
+        'Match Fours': sum(s['fours'] for s in inning_stats),
+        'Match Sixes': sum(s['sixes'] for s in inning_stats),
+        'Match Wickets': sum(s['wickets'] for s in inning_stats),
+        'Match Wides': sum(s['wides'] for s in inning_stats),
         
         # Innings 1 detailed statistics
         'Innings 1 Fours': inning_stats[0]['fours'] if len(inning_stats) > 0 else 0,
@@ -850,78 +1136,175 @@ def get_betting_market_summary_dict(data):
 
 # --- Main Data Processing Function ---
 
-@st.cache_data
-def process_all_files(uploaded_files):
-    """Processes a list of uploaded JSON files and aggregates all data."""
-    all_match_data, all_market_summaries, all_match_summaries, all_ball_by_ball, all_batting, all_bowling = [], [], [], [], [], []
+def intern_names(data):
+    """
+    Interns the team, venue and player names of a parsed match in place.
+    
+    The same names recur in every match; interned copies share one object, so
+    the dicts that aggregate across matches compare their keys by identity.
+    """
+    info = data.get('info', {})
+    if 'teams' in info:
+        info['teams'] = [sys.intern(team) for team in info['teams']]
+    if 'venue' in info:
+        info['venue'] = sys.intern(info['venue'])
+    for section in ('toss', 'outcome'):
+        if 'winner' in info.get(section, {}):
+            info[section]['winner'] = sys.intern(info[section]['winner'])
+    if 'players' in info:
+        info['players'] = {sys.intern(team): [sys.intern(player) for player in players] for team, players in info['players'].items()}
+    for inning in data.get('innings', []):
+        if 'team' in inning:
+            inning['team'] = sys.intern(inning['team'])
 
-    for uploaded_file in uploaded_files:
-        try:
-            data = json.loads(uploaded_file.getvalue())
-            match_id = uploaded_file.name
-            data['match_id'] = match_id
-            
-            all_match_data.append(data)
-            all_market_summaries.append(get_betting_market_summary_dict(data))
-            
-            info, innings = data.get('info', {}), data.get('innings', [])
-            home_team, away_team = info.get('teams', ['N/A', 'N/A'])[:2]
-            winner = info.get('outcome', {}).get('winner', 'No Result')
+# Enough entries for a few multi-season uploads; the least recently used files are evicted first
+MATCH_FILE_CACHE_ENTRIES = 500
 
-            home_score = sum(d['runs']['total'] for o in innings[0]['overs'] for d in o['deliveries']) if len(innings) > 0 else 0
-            away_score = sum(d['runs']['total'] for o in innings[1]['overs'] for d in o['deliveries']) if len(innings) > 1 else 0
-            all_match_summaries.append({'match_id': match_id, 'date': info.get('dates', ['N/A'])[0], 'home_team': home_team, 'away_team': away_team,'toss_winner': info.get('toss', {}).get('winner', 'N/A'), 'toss_decision': info.get('toss', {}).get('decision', 'N/A'),'winner': winner, 'home_score': home_score, 'away_score': away_score, 'venue': info.get('venue', 'N/A')})
-            
-            for i, inning in enumerate(innings):
-                for over in inning.get('overs', []):
-                    for j, delivery in enumerate(over.get('deliveries', [])):
-                        all_ball_by_ball.append({'match_id': match_id, 'inning': i + 1, 'over': over['over'] + 1, 'ball': j + 1, 'batting_team': inning['team'], 'batter': delivery['batter'], 'bowler': delivery['bowler'], 'runs_off_bat': delivery['runs']['batter'], 'extras': delivery['runs']['extras'], 'total_runs': delivery['runs']['total']})
+@st.cache_data(show_spinner=False, max_entries=MATCH_FILE_CACHE_ENTRIES)
+def process_match_file(file_bytes, match_id):
+    """
+    Parses a single uploaded JSON file and computes its per-match summaries.
+    
+    Cached on the file contents, so files that were already processed are not
+    parsed again when the set of uploaded files changes. The cache is shared by
+    all sessions, so it keeps at most MATCH_FILE_CACHE_ENTRIES files.
+    """
+    data = json_loads(file_bytes)
+    data['match_id'] = match_id
+    intern_names(data)
+    
+    scan = scan_match(data)
+    
+    info, inning_stats = data.get('info', {}), scan['inning_stats']
+    home_team, away_team = info.get('teams', ['N/A', 'N/A'])[:2]
+    winner = info.get('outcome', {}).get('winner', 'No Result')
+
+    home_score = inning_stats[0]['total_runs'] if len(inning_stats) > 0 else 0
+    away_score = inning_stats[1]['total_runs'] if len(inning_stats) > 1 else 0
+    
+    return {
+        'data': data,
+        'market_summary': get_betting_market_summary_dict(data, scan),
+        'match_summary': {'match_id': match_id, 'date': info.get('dates', ['N/A'])[0], 'home_team': home_team, 'away_team': away_team,'toss_winner': info.get('toss', {}).get('winner', 'N/A'), 'toss_decision': info.get('toss', {}).get('decision', 'N/A'),'winner': winner, 'home_score': home_score, 'away_score': away_score, 'venue': info.get('venue', 'N/A')},
+        'ball_by_ball': scan['ball_by_ball'],
+        'ball_by_ball_innings': scan['ball_by_ball_innings'],
+        'player_stats': scan['player_stats']
+    }
+
+def _try_process_match_file(file_bytes, match_id):
+    """Runs process_match_file, returning any exception instead of raising it."""
+    try:
+        return process_match_file(file_bytes, match_id)
+    except Exception as e:
+        return e
+
+@st.cache_data
+def process_all_files(uploaded_files):
+    """
+    Processes a list of uploaded JSON files and aggregates all data.
+    
+    Parsing and per-match summaries are cached per file by process_match_file, so
+    when the set of uploads changes only the new files are parsed; this cache then
+    keeps the aggregate for the current set.
+    """
+    all_match_data, all_market_summaries, all_match_summaries = [], [], []
+    all_ball_by_ball = {col: [] for col in BALL_BY_BALL_DTYPES if col not in INNINGS_BALL_COLUMNS}
+    all_ball_by_ball_innings = []  # (match_id, inning, batting_team, row count)
+    # Running totals keyed by (player_name, team)
+    agg_bat = defaultdict(lambda: [0, 0, 0, 0])  # runs, balls_faced, fours, sixes
+    agg_bowl = defaultdict(lambda: [0, 0, 0])  # runs_conceded, balls_bowled, wickets
 
-            bat_df, bowl_df = get_player_summaries_single_match(data)
-            all_batting.append(bat_df)
-            all_bowling.append(bowl_df)
+    # Files are independent, so parse them in parallel; errors are reported from this thread.
+    # A single file is processed inline rather than paying for a pool.
+    file_args = ([f.getvalue() for f in uploaded_files], [f.name for f in uploaded_files])
+    workers = min(len(uploaded_files), os.cpu_count() or 1)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_try_process_match_file, *file_args))
+    else:
+        results = list(map(_try_process_match_file, *file_args))
 
-        except Exception as e:
-            st.error(f"Error processing file {uploaded_file.name}: {e}")
+    for uploaded_file, match in zip(uploaded_files, results):
+        if isinstance(match, Exception):
+            st.error(f"Error processing file {uploaded_file.name}: {match}")
             continue
+        
+        all_match_data.append(match['data'])
+        all_market_summaries.append(match['market_summary'])
+        all_match_summaries.append(match['match_summary'])
+        for col, values in match['ball_by_ball'].items():
+            all_ball_by_ball[col].extend(values)
+        all_ball_by_ball_innings.extend(match['ball_by_ball_innings'])
+        for player, p_stats in match['player_stats'].items():
+            if p_stats['balls_faced'] > 0:
+                totals = agg_bat[(player, p_stats['team'])]
+                totals[0] += p_stats['runs']
+                totals[1] += p_stats['balls_faced']
+                totals[2] += p_stats['fours']
+                totals[3] += p_stats['sixes']
+            if p_stats['balls_bowled'] > 0:
+                totals = agg_bowl[(player, p_stats['team'])]
+                totals[0] += p_stats['runs_conceded']
+                totals[1] += p_stats['balls_bowled']
+                totals[2] += p_stats['wickets']
 
     match_summary_df = pd.DataFrame(all_match_summaries)
-    ball_by_ball_df = pd.DataFrame(all_ball_by_ball)
+    if not match_summary_df.empty:
+        match_summary_df = match_summary_df.astype({col: 'category' for col in MATCH_SUMMARY_CATEGORIES})
+    # Per-innings columns are expanded from run lengths instead of being stored on every ball
+    match_ids, innings_numbers, batting_teams, row_counts = zip(*all_ball_by_ball_innings) if all_ball_by_ball_innings else [()] * 4
+    row_counts = np.asarray(row_counts, dtype=np.intp)
+    ball_by_ball_columns = {
+        'match_id': repeat_categorical(match_ids, row_counts),
+        'inning': np.repeat(downcast_integers(innings_numbers), row_counts),
+        'batting_team': repeat_categorical(batting_teams, row_counts),
+        **{col: pd.Categorical(values) if BALL_BY_BALL_DTYPES[col] == 'category' else downcast_integers(values) for col, values in all_ball_by_ball.items()}
+    }
+    ball_by_ball_df = pd.DataFrame({col: ball_by_ball_columns[col] for col in BALL_BY_BALL_DTYPES})
     market_summaries_df = pd.DataFrame(all_market_summaries)
     
-    agg_batting, agg_bowling = pd.DataFrame(), pd.DataFrame()
-    if all_batting:
-        full_batting_df = pd.concat(all_batting)
-        if not full_batting_df.empty:
-            agg_batting = full_batting_df.groupby(['player_name', 'team'])[['runs', 'balls_faced', 'fours', 'sixes']].sum().reset_index()
-            agg_batting['strike_rate'] = (agg_batting['runs'] / agg_batting['balls_faced'].replace(0, 1) * 100).round(2)
+    agg_batting = pd.DataFrame.from_records([(p, t, *v) for (p, t), v in sorted(agg_bat.items())], columns=['player_name', 'team', 'runs', 'balls_faced', 'fours', 'sixes'])
+    balls_faced = agg_batting['balls_faced'].to_numpy()
+    agg_batting['strike_rate'] = (agg_batting['runs'].to_numpy() / np.where(balls_faced == 0, 1, balls_faced) * 100).round(2)
+
+    agg_bowling = pd.DataFrame.from_records([(p, t, *v) for (p, t), v in sorted(agg_bowl.items())], columns=['player_name', 'team', 'runs_conceded', 'balls_bowled', 'wickets'])
+    agg_bowling['overs'] = format_overs(agg_bowling['balls_bowled'])
+    balls_bowled = agg_bowling['balls_bowled'].to_numpy()
+    agg_bowling['economy_rate'] = (agg_bowling['runs_conceded'].to_numpy() / (np.where(balls_bowled == 0, 1, balls_bowled) / 6)).round(2)
 
-    if all_bowling:
-        full_bowling_df = pd.concat(all_bowling)
-        if not full_bowling_df.empty:
-            agg_bowling = full_bowling_df.groupby(['player_name', 'team'])[['runs_conceded', 'balls_bowled', 'wickets']].sum().reset_index()
-            agg_bowling['overs'] = agg_bowling['balls_bowled'].apply(lambda x: f"{int(x // 6)}.{int(x % 6)}")
-            agg_bowling['economy_rate'] = (agg_bowling['runs_conceded'] / (agg_bowling['balls_bowled'].replace(0, 1) / 6)).round(2)
+    agg_batting = agg_batting.sort_values('runs', ascending=False)
+    agg_bowling = agg_bowling.sort_values('wickets', ascending=False)
+    # Counts fit the smallest unsigned type their totals allow, and team names repeat on every row
+    for df, count_cols in ((agg_batting, ['runs', 'balls_faced', 'fours', 'sixes']), (agg_bowling, ['runs_conceded', 'balls_bowled', 'wickets'])):
+        for col in count_cols:
+            df[col] = pd.to_numeric(df[col], downcast='unsigned')
+        df['team'] = df['team'].astype('category')
 
-    return all_match_data, match_summary_df, ball_by_ball_df, agg_batting.sort_values('runs', ascending=False), agg_bowling.sort_values('wickets', ascending=False), market_summaries_df
+    return all_match_data, match_summary_df, ball_by_ball_df, agg_batting, agg_bowling, market_summaries_df
+
+# Most teams drawn in the Team-wise win percentage chart
+WIN_CHART_TEAMS = 30
 
 # --- CSV Analyzer Functions ---
 def display_toss_analysis(df):
+    import plotly.express as px  # Deferred: only needed once a chart is drawn
     st.subheader("Toss Analysis")
     if 'Toss Winner' in df.columns and 'Match Winner' in df.columns:
-        toss_winner_match_winner = df[df['Toss Winner'] == df['Match Winner']]
-        toss_win_rate = (len(toss_winner_match_winner) / len(df)) * 100 if len(df) > 0 else 0
+        toss_winner_won = (df['Toss Winner'] == df['Match Winner']).to_numpy()
+        toss_win_rate = toss_winner_won.mean() * 100 if len(df) > 0 else 0
         
         st.metric("Toss Winner Wins Match %", f"{toss_win_rate:.2f}%")
         
-        if not toss_winner_match_winner.empty and 'toss_decision' in toss_winner_match_winner.columns:
+        # Only the decision column of the matching rows is needed for the chart
+        if toss_winner_won.any() and 'toss_decision' in df.columns:
             st.write("**Winning Toss Decision Breakdown:**")
-            fig = px.pie(toss_winner_match_winner, names='toss_decision', title='Decision of Toss Winners Who Also Won the Match')
+            fig = px.pie(df.loc[toss_winner_won, ['toss_decision']], names='toss_decision', title='Decision of Toss Winners Who Also Won the Match')
             st.plotly_chart(fig, use_container_width=True)
     else:
         st.warning("Toss Winner or Match Winner columns not found in the uploaded CSV.")
 
 def display_frequency_analysis(df):
+    import plotly.express as px  # Deferred: only needed once a chart is drawn
     st.subheader("Frequency Analysis")
     categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
     if categorical_cols:
@@ -961,15 +1344,10 @@ page = st.sidebar.radio("Choose an analyzer", nav_options)
 if page == "JSON Data Analyzer":
     if st.session_state.json_files:
         raw_data, match_summary, bbb, batting_summary, bowling_summary, market_summaries_df = process_all_files(st.session_state.json_files)
+        # Identifies this set of uploads for caches that should not hash raw_data itself
+        uploads_key = tuple(f.file_id for f in st.session_state.json_files)
         
-        # Calculate comprehensive betting markets
-        if BETTING_MARKETS_AVAILABLE:
-            betting_markets = calculate_betting_markets(raw_data)
-            formatted_betting_markets = format_betting_markets_for_display(betting_markets)
-        else:
-            betting_markets = {}
-            formatted_betting_markets = {}
-
+        # Derived data below is built only when the view that shows it is selected
         st.sidebar.subheader("JSON Analyzer Views")
         json_page = st.sidebar.radio("Choose a data view", ["Match Summaries", "Aggregated Batting Stats", "Aggregated Bowling Stats", "Combined Ball-by-Ball", "Betting Market Summaries", "Markov Chain Statistics", "Venue-wise Statistics", "Team-wise Statistics"])
         
@@ -981,32 +1359,39 @@ if page == "JSON Data Analyzer":
             st.dataframe(match_summary)
             if st.button("Copy Summaries to Clipboard"):
                 st.text_area("Copy this text", match_summary.to_csv(index=False), height=200)
-            st.download_button("Download Summaries CSV", to_csv(match_summary), "match_summaries.csv", "text/csv")
+            st.download_button("Download Summaries CSV", csv_download(match_summary), "match_summaries.csv", "text/csv")
         
         elif json_page == "Aggregated Batting Stats":
             st.subheader("Aggregated Player Batting Stats")
             st.dataframe(batting_summary)
             if st.button("Copy Batting Stats to Clipboard"):
                 st.text_area("Copy this text", batting_summary.to_csv(index=False), height=200)
-            st.download_button("Download Batting CSV", to_csv(batting_summary), "aggregated_batting_summary.csv", "text/csv")
+            st.download_button("Download Batting CSV", csv_download(batting_summary), "aggregated_batting_summary.csv", "text/csv")
         
         elif json_page == "Aggregated Bowling Stats":
             st.subheader("Aggregated Player Bowling Stats")
             st.dataframe(bowling_summary)
             if st.button("Copy Bowling Stats to Clipboard"):
                 st.text_area("Copy this text", bowling_summary.to_csv(index=False), height=200)
-            st.download_button("Download Bowling CSV", to_csv(bowling_summary), "aggregated_bowling_summary.csv", "text/csv")
+            st.download_button("Download Bowling CSV", csv_download(bowling_summary), "aggregated_bowling_summary.csv", "text/csv")
         
         elif json_page == "Combined Ball-by-Ball":
             st.subheader("Combined Ball-by-Ball Data")
             st.dataframe(bbb)
             if st.button("Copy Ball-by-Ball Data to Clipboard"):
                 st.text_area("Copy this text", bbb.to_csv(index=False), height=200)
-            st.download_button("Download Ball-by-Ball CSV", to_csv(bbb), "combined_ball_by_ball.csv", "text/csv")
+            st.download_button("Download Ball-by-Ball CSV", csv_download(bbb), "combined_ball_by_ball.csv", "text/csv")
         
         elif json_page == "Betting Market Summaries":
             st.subheader("🎯 Comprehensive Betting Markets Analysis")
             
+            # Calculate comprehensive betting markets
+            if BETTING_MARKETS_AVAILABLE:
+                betting_markets, formatted_betting_markets = cached_betting_markets(uploads_key, raw_data)
+            else:
+                betting_markets = {}
+                formatted_betting_markets = {}
+            
             if not BETTING_MARKETS_AVAILABLE:
                 st.error("❌ Betting Markets module is not available.")
                 if betting_markets_error:
@@ -1484,7 +1869,7 @@ if page == "JSON Data Analyzer":
                     export_df = pd.DataFrame(export_data)
                     st.download_button(
                         label="📥 Download Complete Betting Markets Analysis",
-                        data=to_csv(export_df),
+                        data=csv_download(export_df),
                         file_name="comprehensive_betting_markets.csv",
                         mime="text/csv"
                     )
@@ -1493,7 +1878,7 @@ if page == "JSON Data Analyzer":
                 if not market_summaries_df.empty:
                     st.download_button(
                         label="📥 Download Legacy Market Summaries",
-                        data=to_csv(market_summaries_df),
+                        data=csv_download(market_summaries_df),
                         file_name="legacy_market_summaries.csv",
                         mime="text/csv"
                     )
@@ -1503,6 +1888,7 @@ if page == "JSON Data Analyzer":
                 st.info("Please ensure your JSON files contain valid cricket match data with innings information.")
         
         elif json_page == "Markov Chain Statistics":
+            import plotly.express as px  # Deferred: only needed once a chart is drawn
             st.subheader("Markov Chain Statistics for Cricket Simulation")
             st.info("These statistics are designed for building Markov chain models to simulate cricket matches.")
             
@@ -1514,7 +1900,8 @@ if page == "JSON Data Analyzer":
                 team_wise_analysis = st.checkbox("Team-wise Analysis", value=False, help="Calculate separate statistics for each team")
             
             # Calculate Markov chain statistics
-            markov_stats = calculate_markov_chain_stats(raw_data, team_wise=team_wise_analysis)
+            deliveries = cached_flatten_deliveries(uploads_key, raw_data)
+            markov_stats = cached_markov_chain_stats(uploads_key, team_wise_analysis, raw_data, deliveries)
             
             if "error" in markov_stats:
                 st.error(markov_stats["error"])
@@ -1662,7 +2049,7 @@ if page == "JSON Data Analyzer":
                 export_df = pd.DataFrame(stats_for_export)
                 st.download_button(
                     "Download Markov Chain Statistics CSV", 
-                    to_csv(export_df), 
+                    csv_download(export_df), 
                     "markov_chain_statistics.csv", 
                     "text/csv"
                 )
@@ -1678,11 +2065,13 @@ if page == "JSON Data Analyzer":
                 """)
         
         elif json_page == "Venue-wise Statistics":
+            import plotly.express as px  # Deferred: only needed once a chart is drawn
             st.subheader("Venue-wise Cricket Statistics")
             st.info("Analyze how different venues affect match outcomes, scoring patterns, and team strategies.")
             
             # Calculate venue-wise statistics
-            venue_stats = calculate_venue_wise_stats(raw_data)
+            deliveries = cached_flatten_deliveries(uploads_key, raw_data)
+            venue_stats = cached_venue_wise_stats(uploads_key, raw_data, deliveries)
             
             if not venue_stats:
                 st.warning("No venue data found in the uploaded files.")
@@ -1727,7 +2116,7 @@ if page == "JSON Data Analyzer":
                 # Download venue comparison
                 st.download_button(
                     "Download Venue Comparison CSV",
-                    to_csv(venue_df),
+                    csv_download(venue_df),
                     "venue_comparison.csv",
                     "text/csv"
                 )
@@ -1921,7 +2310,7 @@ if page == "JSON Data Analyzer":
                 detailed_venue_df = pd.DataFrame(detailed_venue_data)
                 st.download_button(
                     "Download Detailed Venue Statistics CSV",
-                    to_csv(detailed_venue_df),
+                    csv_download(detailed_venue_df),
                     "detailed_venue_statistics.csv",
                     "text/csv"
                 )
@@ -1937,18 +2326,24 @@ if page == "JSON Data Analyzer":
                 """)
         
         elif json_page == "Team-wise Statistics":
+            import plotly.graph_objects as go  # Deferred: only needed once a chart is drawn
             st.subheader("Team-wise Cricket Statistics")
             st.info("Comprehensive analysis of team performance, batting/bowling patterns, and head-to-head comparisons.")
             
             # Calculate team-wise statistics
-            team_stats = calculate_team_wise_stats(raw_data)
+            deliveries = cached_flatten_deliveries(uploads_key, raw_data)
+            team_stats = cached_team_wise_stats(uploads_key, raw_data, deliveries)
             
             if not team_stats:
                 st.warning("No team data found in the uploaded files.")
             else:
+                # One row per team; the tables and charts below are column selections of it
+                team_frame = pd.DataFrame.from_dict(team_stats, orient='index').rename_axis('Team')
+                
                 # Overview metrics
                 total_teams = len(team_stats)
-                total_matches_analyzed = sum(stats['matches_played'] for stats in team_stats.values()) // 2  # Divide by 2 since each match involves 2 teams
+                total_team_matches = int(team_frame['matches_played'].sum())
+                total_matches_analyzed = total_team_matches // 2  # Divide by 2 since each match involves 2 teams
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -1956,46 +2351,41 @@ if page == "JSON Data Analyzer":
                 with col2:
                     st.metric("Total Matches", total_matches_analyzed)
                 with col3:
-                    avg_matches_per_team = sum(stats['matches_played'] for stats in team_stats.values()) / total_teams if total_teams > 0 else 0
+                    avg_matches_per_team = total_team_matches / total_teams if total_teams > 0 else 0
                     st.metric("Avg Matches per Team", f"{avg_matches_per_team:.1f}")
                 
-                st.markdown("---")
-                
-                # Team comparison table
-                st.subheader("Team Performance Overview")
-                
-                # Create DataFrame for team comparison
-                team_comparison_data = []
-                for team, stats in team_stats.items():
-                    team_comparison_data.append({
-                        'Team': team,
-                        'Matches': stats['matches_played'],
-                        'Win %': f"{stats['win_percentage']:.1f}%",
-                        'Avg Score': f"{stats['avg_score']:.0f}",
-                        'Strike Rate': f"{stats['strike_rate']:.1f}",
-                        'Boundary %': f"{stats['boundary_percentage']:.1f}%",
-                        'Bowling Economy': f"{stats['bowling_economy']:.2f}",
-                        'Toss Win %': f"{stats['toss_win_percentage']:.1f}%",
-                        'Venues': stats['venues_played']
-                    })
-                
-                team_df = pd.DataFrame(team_comparison_data)
+                # Team comparison table; each section rule is drawn together with its heading as one element
+                st.markdown("---\n\n### Team Performance Overview")
+                
+                # Create DataFrame for team comparison; columns stay numeric and are formatted for display only
+                team_df = pd.DataFrame({
+                    'Matches': team_frame['matches_played'],
+                    'Win %': team_frame['win_percentage'],
+                    'Avg Score': team_frame['avg_score'],
+                    'Strike Rate': team_frame['strike_rate'],
+                    'Boundary %': team_frame['boundary_percentage'],
+                    'Bowling Economy': team_frame['bowling_economy'],
+                    'Toss Win %': team_frame['toss_win_percentage'],
+                    'Venues': team_frame['venues_played']
+                }).reset_index()
                 # Sort by win percentage
-                team_df = team_df.sort_values('Win %', ascending=False, key=lambda x: x.str.rstrip('%').astype(float))
-                st.dataframe(team_df, use_container_width=True)
+                team_df = team_df.sort_values('Win %', ascending=False)
+                team_formats = {
+                    'Win %': '{:.1f}%', 'Avg Score': '{:.0f}', 'Strike Rate': '{:.1f}', 'Boundary %': '{:.1f}%',
+                    'Bowling Economy': '{:.2f}', 'Toss Win %': '{:.1f}%'
+                }
+                st.dataframe(team_df.style.format(team_formats), use_container_width=True)
                 
-                # Download team comparison
+                # Download team comparison, with the same formatted values as the table
                 st.download_button(
                     "Download Team Comparison CSV",
-                    to_csv(team_df),
+                    csv_download(team_df.assign(**{col: team_df[col].map(fmt.format) for col, fmt in team_formats.items()})),
                     "team_comparison.csv",
                     "text/csv"
                 )
                 
-                st.markdown("---")
-                
                 # Detailed team analysis
-                st.subheader("Detailed Team Analysis")
+                st.markdown("---\n\n### Detailed Team Analysis")
                 
                 # Team selector
                 selected_team = st.selectbox(
@@ -2094,8 +2484,7 @@ if page == "JSON Data Analyzer":
                         st.metric("Wicket", f"{team_data['wicket_percentage_per_ball']:.2f}%")
 
                 # Ball outcome probabilities for Markov chain modeling
-                st.markdown("---")
-                st.write("**Ball Outcome Probabilities (for Markov States):**")
+                st.markdown("---\n\n**Ball Outcome Probabilities (for Markov States):**")
                 st.info("These probabilities show how this team typically scores runs per ball - essential for Markov chain simulation.")
                 
                 prob_cols = st.columns(4)
@@ -2116,6 +2505,7 @@ if page == "JSON Data Analyzer":
                         })
                 
                 if team_runs_data:
+                    import plotly.express as px  # Only this chart still uses px; its import is several times go's
                     team_runs_df = pd.DataFrame(team_runs_data)
                     fig_team_runs = px.bar(
                         team_runs_df, 
@@ -2126,125 +2516,80 @@ if page == "JSON Data Analyzer":
                     )
                     st.plotly_chart(fig_team_runs, use_container_width=True)
                 
-                st.markdown("---")
-                
                 # Team comparisons with visualizations
-                st.subheader("Team Performance Comparisons")
+                st.markdown("---\n\n### Team Performance Comparisons")
                 
                 if len(team_stats) > 1:
                     # Win percentage comparison
-                    win_data = []
-                    for team, stats in team_stats.items():
-                        win_data.append({
-                            'Team': team,
-                            'Win %': stats['win_percentage'],
-                            'Matches': stats['matches_played']
-                        })
-                    
-                    win_df = pd.DataFrame(win_data)
-                    win_df = win_df.sort_values('Win %', ascending=True)  # Sort for better visualization
-                    fig_win = px.bar(
-                        win_df, 
-                        x='Win %', 
-                        y='Team',
+                    # Only the top WIN_CHART_TEAMS teams are charted: partition them out, then sort just those
+                    win_pct = team_frame['win_percentage'].to_numpy()
+                    top = np.arange(len(win_pct))
+                    if len(win_pct) > WIN_CHART_TEAMS:
+                        top = np.argpartition(win_pct, -WIN_CHART_TEAMS)[-WIN_CHART_TEAMS:]
+                    top = top[np.argsort(win_pct[top], kind='stable')]  # Ascending, so the best team is drawn on top
+                    # Team charts are built from graph_objects traces directly; px re-inspects the frame on every rerun
+                    fig_win = go.Figure(go.Bar(
+                        x=win_pct[top],
+                        y=team_frame.index.to_numpy()[top],
                         orientation='h',
-                        title='Win Percentage by Team',
-                        hover_data=['Matches']
-                    )
+                        customdata=team_frame['matches_played'].to_numpy()[top],
+                        hovertemplate='Win %=%{x}<br>Team=%{y}<br>Matches=%{customdata}<extra></extra>'
+                    ))
+                    win_title = 'Win Percentage by Team' if len(top) == len(win_pct) else f'Win Percentage by Team (Top {len(top)})'
+                    fig_win.update_layout(title=win_title, xaxis_title='Win %', yaxis_title='Team')
                     st.plotly_chart(fig_win, use_container_width=True)
                     
                     # Batting vs Bowling performance
-                    performance_data = []
-                    for team, stats in team_stats.items():
-                        performance_data.append({
-                            'Team': team,
-                            'Strike Rate': stats['strike_rate'],
-                            'Economy Rate': stats['bowling_economy'],
-                            'Avg Score': stats['avg_score']
-                        })
-                    
-                    perf_df = pd.DataFrame(performance_data)
-                    fig_perf = px.scatter(
-                        perf_df, 
-                        x='Strike Rate', 
-                        y='Economy Rate',
-                        size='Avg Score',
-                        hover_name='Team',
-                        title='Batting Strike Rate vs Bowling Economy Rate',
-                        labels={'Strike Rate': 'Batting Strike Rate', 'Economy Rate': 'Bowling Economy Rate'}
-                    )
+                    perf_df = team_frame[['strike_rate', 'bowling_economy', 'avg_score']].rename(columns={'strike_rate': 'Strike Rate', 'bowling_economy': 'Economy Rate', 'avg_score': 'Avg Score'}).reset_index()
+                    avg_scores = perf_df['Avg Score'].to_numpy()
+                    fig_perf = go.Figure(go.Scatter(
+                        x=perf_df['Strike Rate'].to_numpy(),
+                        y=perf_df['Economy Rate'].to_numpy(),
+                        mode='markers',
+                        # Area-scaled markers up to 20px, as px.scatter(size=...) draws them
+                        marker=dict(size=avg_scores, sizemode='area', sizeref=2 * max(avg_scores.max(), 1) / 20 ** 2),
+                        text=perf_df['Team'].to_numpy(),
+                        hovertemplate='<b>%{text}</b><br>Batting Strike Rate=%{x}<br>Bowling Economy Rate=%{y}<br>Avg Score=%{marker.size}<extra></extra>'
+                    ))
+                    fig_perf.update_layout(title='Batting Strike Rate vs Bowling Economy Rate', xaxis_title='Batting Strike Rate', yaxis_title='Bowling Economy Rate')
                     st.plotly_chart(fig_perf, use_container_width=True)
                     
                     # Phase-wise performance comparison
-                    phase_data = []
-                    for team, stats in team_stats.items():
-                        phase_data.extend([
-                            {'Team': team, 'Phase': 'Powerplay', 'Runs Scored': stats['avg_powerplay_runs'], 'Runs Conceded': stats['avg_powerplay_runs_conceded']},
-                            {'Team': team, 'Phase': 'Death Overs', 'Runs Scored': stats['avg_death_over_runs'], 'Runs Conceded': stats['avg_death_over_runs_conceded']}
-                        ])
-                    
-                    phase_df = pd.DataFrame(phase_data)
-                    
-                    # Runs scored comparison
-                    fig_phase_scored = px.bar(
-                        phase_df, 
-                        x='Team', 
-                        y='Runs Scored',
-                        color='Phase',
-                        title='Phase-wise Runs Scored by Team',
-                        barmode='group'
-                    )
-                    fig_phase_scored.update_xaxes(tickangle=45)
-                    st.plotly_chart(fig_phase_scored, use_container_width=True)
-                    
-                    # Runs conceded comparison
-                    fig_phase_conceded = px.bar(
-                        phase_df, 
-                        x='Team', 
-                        y='Runs Conceded',
-                        color='Phase',
-                        title='Phase-wise Runs Conceded by Team',
-                        barmode='group'
-                    )
-                    fig_phase_conceded.update_xaxes(tickangle=45)
-                    st.plotly_chart(fig_phase_conceded, use_container_width=True)
+                    for fig_phase in cached_team_phase_figures(uploads_key, team_frame):
+                        st.plotly_chart(fig_phase, use_container_width=True)
                 
                 # Export detailed team statistics
-                st.markdown("---")
-                st.subheader("Export Team Statistics")
+                st.markdown("---\n\n### Export Team Statistics")
                 
                 # Create detailed export data
-                detailed_team_data = []
-                for team, stats in team_stats.items():
-                    detailed_team_data.append({
-                        'Team': team,
-                        'Matches_Played': stats['matches_played'],
-                        'Matches_Won': stats['matches_won'],
-                        'Win_Percentage': stats['win_percentage'],
-                        'Avg_Score': stats['avg_score'],
-                        'Highest_Score': stats['highest_score'],
-                        'Lowest_Score': stats['lowest_score'],
-                        'Strike_Rate': stats['strike_rate'],
-                        'Avg_Run_Rate': stats['avg_run_rate'],
-                        'Boundary_Percentage': stats['boundary_percentage'],
-                        'Dot_Ball_Percentage': stats['dot_ball_percentage'],
-                        'Avg_Powerplay_Runs': stats['avg_powerplay_runs'],
-                        'Avg_Death_Over_Runs': stats['avg_death_over_runs'],
-                        'Bowling_Economy': stats['bowling_economy'],
-                        'Bowling_Strike_Rate': stats['bowling_strike_rate'],
-                        'Total_Wickets_Taken': stats['total_wickets_taken'],
-                        'Toss_Win_Percentage': stats['toss_win_percentage'],
-                        'Toss_Win_Match_Win_Rate': stats['toss_win_match_win_rate'],
-                        'Bat_First_Win_Rate': stats['bat_first_win_rate'],
-                        'Bowl_First_Win_Rate': stats['bowl_first_win_rate'],
-                        'Venues_Played': stats['venues_played'],
-                        'Opponents_Faced': stats['opponents_faced']
-                    })
-                
-                detailed_team_df = pd.DataFrame(detailed_team_data)
+                export_columns = {
+                    'matches_played': 'Matches_Played',
+                    'matches_won': 'Matches_Won',
+                    'win_percentage': 'Win_Percentage',
+                    'avg_score': 'Avg_Score',
+                    'highest_score': 'Highest_Score',
+                    'lowest_score': 'Lowest_Score',
+                    'strike_rate': 'Strike_Rate',
+                    'avg_run_rate': 'Avg_Run_Rate',
+                    'boundary_percentage': 'Boundary_Percentage',
+                    'dot_ball_percentage': 'Dot_Ball_Percentage',
+                    'avg_powerplay_runs': 'Avg_Powerplay_Runs',
+                    'avg_death_over_runs': 'Avg_Death_Over_Runs',
+                    'bowling_economy': 'Bowling_Economy',
+                    'bowling_strike_rate': 'Bowling_Strike_Rate',
+                    'total_wickets_taken': 'Total_Wickets_Taken',
+                    'toss_win_percentage': 'Toss_Win_Percentage',
+                    'toss_win_match_win_rate': 'Toss_Win_Match_Win_Rate',
+                    'bat_first_win_rate': 'Bat_First_Win_Rate',
+                    'bowl_first_win_rate': 'Bowl_First_Win_Rate',
+                    'venues_played': 'Venues_Played',
+                    'opponents_faced': 'Opponents_Faced'
+                }
+                # Columns are selected from the per-team frame rather than re-read from each team's stats dict
+                detailed_team_df = team_frame[list(export_columns)].rename(columns=export_columns).reset_index()
                 st.download_button(
                     "Download Detailed Team Statistics CSV",
-                    to_csv(detailed_team_df),
+                    csv_download(detailed_team_df),
                     "detailed_team_statistics.csv",
                     "text/csv"
                 )
@@ -2269,18 +2614,23 @@ elif page == "CSV Market Analyzer":
     csv_file = st.file_uploader("Upload Market Summary CSV", type=["csv"])
     
     if csv_file:
-        df = pd.read_csv(csv_file)
+        # The preview only needs the first rows, so it is drawn before the full file is parsed
         st.subheader("Uploaded Data Preview")
-        st.dataframe(df.head())
+        st.dataframe(pd.read_csv(io.BytesIO(csv_file.getvalue()), nrows=5))
         
         st.sidebar.subheader("CSV Analyzer Views")
         analysis_type = st.sidebar.radio("Choose Analysis Type", ["Descriptive Statistics", "Frequency Analysis", "Toss Analysis"])
         st.markdown("---")
+        df = cached_read_csv(csv_file.file_id, csv_file)
         
         if analysis_type == "Descriptive Statistics":
             st.subheader("Descriptive Statistics")
             st.write("Summary of numerical columns in your data.")
-            st.dataframe(df.describe())
+            numeric_df = df.select_dtypes('number')
+            if numeric_df.columns.empty:
+                st.info("No numerical columns found for descriptive statistics.")
+            else:
+                st.dataframe(numeric_df.describe())
             
         elif analysis_type == "Frequency Analysis":
             display_frequency_analysis(df)
@@ -4,6 +4,7 @@ Calculates comprehensive betting market statistics from cricsheet JSON data
 """
 
 import json
+import numpy as np
 from collections import defaultdict
 from typing import Dict, List, Any, Tuple, Optional
 
@@ -180,9 +181,8 @@ def _calculate_match_stats(match_data: Dict) -> Dict:
             
             for ball_idx, delivery in enumerate(over.get('deliveries', [])):
                 # Skip wides and no-balls for certain calculations
-                is_legal_delivery = 'extras' not in delivery or not any(
-                    k in delivery['extras'] for k in ['wides', 'noballs']
-                )
+                extras = delivery.get('extras')
+                is_legal_delivery = extras is None or ('wides' not in extras and 'noballs' not in extras)
                 
                 runs = delivery['runs']['batter']
                 total_runs = delivery['runs']['total']
@@ -510,9 +510,10 @@ def _calculate_market_summaries(markets: Dict) -> None:
                 # Calculate over/under percentages for predefined lines
                 lines = over_under_lines.get(market_name, [market_data['average']])
                 market_data['over_under_analysis'] = {}
+                values = np.asarray(data_list)
                 
                 for line in lines:
-                    over_count = sum(1 for value in data_list if value > line)
+                    over_count = int(np.count_nonzero(values > line))
                     under_count = len(data_list) - over_count
                     
                     market_data['over_under_analysis'][f'line_{line}'] = {
@@ -641,7 +642,7 @@ def calculate_custom_over_under(data_list: List[float], custom_line: float) -> D
     if not data_list:
         return {'error': 'No data available'}
     
-    over_count = sum(1 for value in data_list if value > custom_line)
+    over_count = int(np.count_nonzero(np.asarray(data_list) > custom_line))
     under_count = len(data_list) - over_count
     
     return {